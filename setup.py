@@ -91,6 +91,9 @@ setup(
                      'Adafruit-GPIO',
                      'Adafruit_BNO055',
                     ],
+    extras_require={
+        'features': ['numpy'],
+    },
     dependency_links = [
       'https://github.com/bibi21000/janitoo/archive/master.zip#egg=janitoo',
       'https://github.com/bibi21000/janitoo_raspberry/archive/master.zip#egg=janitoo_raspberry',
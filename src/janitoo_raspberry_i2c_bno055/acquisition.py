@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""The acquisition thread
+
+Sample the BNO055 at a fixed rate, faster than the Janitoo poll loop can,
+and keep the last frames in a ring buffer.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import logging
+logger = logging.getLogger(__name__)
+import threading
+from array import array
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES, CHANNEL_INDEX, FRAME_WIDTH, Frame, monotonic
+from janitoo_raspberry_i2c_bno055.recovery import ThrottledLog
+
+class FrameRing(object):
+    """A fixed size ring buffer of timestamped frames
+
+    Frames are stored as their raw int16 values in a preallocated array,
+    one row per frame, so the memory used does not grow with the number of
+    samples. The values are converted to their units when they are read.
+    """
+
+    channels = CHANNEL_NAMES
+    width = FRAME_WIDTH
+
+    def __init__(self, capacity):
+        """
+        :param capacity: the number of frames kept
+        """
+        self.capacity = capacity
+        self._data = array('h', [0]) * (capacity * FRAME_WIDTH)
+        self._stamps = array('d', [0.0]) * capacity
+        #The total number of frames pushed
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def push(self, frame, stamp):
+        """Store a Frame (or a dict of channels, for tests and simulations)
+        """
+        if not isinstance(frame, Frame):
+            frame = Frame.from_dict(frame)
+        with self._lock:
+            slot = self.count % self.capacity
+            base = slot * FRAME_WIDTH
+            self._data[base:base + FRAME_WIDTH] = frame.raw
+            self._stamps[slot] = stamp
+            self.count += 1
+
+    def _row(self, slot):
+        base = slot * FRAME_WIDTH
+        return Frame(self._data[base:base + FRAME_WIDTH], self._stamps[slot])
+
+    def latest(self):
+        """Return the last (stamp, frame) or None if the ring is empty
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            slot = (self.count - 1) % self.capacity
+            return self._stamps[slot], self._row(slot)
+
+    def window(self, size=None):
+        """Return the last size (stamp, frame), the oldest first
+        """
+        with self._lock:
+            size = len(self) if size is None else min(size, len(self))
+            start = self.count - size
+            return [(self._stamps[i % self.capacity], self._row(i % self.capacity))
+                    for i in range(start, self.count)]
+
+    def column(self, name, size=None):
+        """Return the last size values of channel name, the oldest first
+        """
+        col, scale = CHANNEL_INDEX[name]
+        with self._lock:
+            size = len(self) if size is None else min(size, len(self))
+            start = self.count - size
+            return [self._data[(i % self.capacity) * FRAME_WIDTH + col] * scale
+                    for i in range(start, self.count)]
+
+    def snapshot(self, size=None):
+        """Return copies of the last size stamps and raw rows, the oldest first,
+        as (array of stamps, flat array('h') of rows). Made for vectorized processing
+        """
+        with self._lock:
+            size = len(self) if size is None else min(size, len(self))
+            start = (self.count - size) % self.capacity
+            end = start + size
+            width = FRAME_WIDTH
+            if end <= self.capacity:
+                return self._stamps[start:end], self._data[start * width:end * width]
+            end -= self.capacity
+            return (self._stamps[start:] + self._stamps[:end],
+                self._data[start * width:] + self._data[:end * width])
+
+    def clear(self):
+        """Forget all the frames
+        """
+        with self._lock:
+            self.count = 0
+
+class AcquisitionThread(threading.Thread):
+    """Read frames at a fixed rate and store them in FrameRings
+
+    The reader returns the frames of a cycle, one per ring (None for a
+    failed read). A frame is stored with the stamp of its read when it has
+    one, with the stamp of the start of the cycle otherwise. A cycle whose
+    reader raises is counted in errors and skipped.
+    The reader is responsible of the bus locks : it must only hold them
+    for the block reads, so other components on the bus are not starved.
+    The thread holds lock during a cycle : hold it to change the settings
+    of the listeners between two cycles.
+    """
+
+    def __init__(self, reader, rings, rate, listeners=None, name="bno_acquisition", gate=None):
+        """
+        :param reader: the callable reading the frames of a cycle
+        :param rings: the FrameRings to fill
+        :param rate: the sample rate in Hz
+        :param listeners: callables called with (stamp, frame, index) for each new frame
+        :param gate: a threading.Event : when it is cleared, the sampling is paused
+        """
+        threading.Thread.__init__(self, name=name)
+        self.daemon = True
+        self.reader = reader
+        self.rings = rings
+        self.period = 1.0 / rate
+        self.listeners = listeners if listeners is not None else []
+        self.overruns = 0
+        self.errors = 0
+        self.throttled = ThrottledLog(logger)
+        self.deadline = None
+        self.gate = gate
+        self.lock = threading.Lock()
+        self._stopevent = threading.Event()
+
+    def run(self):
+        """Sample until stopped
+        """
+        logger.debug("[%s] - Start acquisition at %s Hz", self.__class__.__name__, 1.0 / self.period)
+        deadline = monotonic()
+        while not self._stopevent.is_set():
+            if self.gate is not None and not self.gate.is_set():
+                self.gate.wait()
+                if self._stopevent.is_set():
+                    break
+                deadline = monotonic()
+            with self.lock:
+                #The reads of the cycle should end before the next one
+                self.deadline = deadline + self.period
+                start = monotonic()
+                try:
+                    frames = self.reader()
+                except Exception:
+                    self.errors += 1
+                    self.throttled.exception('reader', "[%s] - Exception in reader %s", self.__class__.__name__, self.reader)
+                    frames = ()
+                for index, frame in enumerate(frames):
+                    if frame is None:
+                        continue
+                    stamp = getattr(frame, 'stamp', None)
+                    if stamp is None:
+                        stamp = start
+                    self.rings[index].push(frame, stamp)
+                    for listener in self.listeners:
+                        try:
+                            listener(stamp, frame, index)
+                        except Exception:
+                            logger.exception("[%s] - Exception in listener %s", self.__class__.__name__, listener)
+            deadline += self.period
+            delay = deadline - monotonic()
+            if delay < 0:
+                #We are late : skip the missed periods instead of bursting
+                self.overruns += 1
+                deadline = monotonic()
+                delay = 0
+            self._stopevent.wait(delay)
+        logger.debug("[%s] - Stop acquisition", self.__class__.__name__)
+
+    def set_rate(self, rate):
+        """Change the sample rate. Applied from the next cycle
+        """
+        self.period = 1.0 / rate
+
+    def stop(self):
+        """Ask the thread to stop
+        """
+        self._stopevent.set()
+        if self.gate is not None:
+            self.gate.set()
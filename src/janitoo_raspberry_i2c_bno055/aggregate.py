@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""The windowed aggregators
+
+Compute mean, min, max, RMS and peak to peak over the last samples of a
+channel. The statistics are updated incrementally on each sample : running
+sums for mean and RMS, monotonic deques for min and max. Nothing rescans
+the window when a value is published.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import math
+import threading
+from collections import deque
+
+STATS = ('mean', 'min', 'max', 'rms', 'p2p')
+
+def accel_magnitude(frame):
+    """The magnitude of the acceleration vector
+    """
+    return math.sqrt(frame['accel_x'] ** 2 + frame['accel_y'] ** 2 + frame['accel_z'] ** 2)
+
+def gyro_magnitude(frame):
+    """The magnitude of the angular rate vector
+    """
+    return math.sqrt(frame['gyro_x'] ** 2 + frame['gyro_y'] ** 2 + frame['gyro_z'] ** 2)
+
+#The aggregated channels : (name, help, function extracting the value from a frame)
+AGGREGATES = (
+    ('accel_magnitude', 'the acceleration magnitude (in m/s²)', accel_magnitude),
+    ('heading', 'the heading (in degrees, rms is the deviation from the circular mean)', lambda frame: frame['heading']),
+    ('temperature', 'the temperature (in °C)', lambda frame: frame['temperature']),
+)
+
+class WindowAggregator(object):
+    """Sliding window statistics over the last size samples
+    """
+
+    def __init__(self, size):
+        """
+        :param size: the number of samples in the window
+        """
+        self.size = max(1, size)
+        self._values = deque()
+        #Monotonic deques of (sequence, value) : the head is the min (or max) of the window
+        self._mins = deque()
+        self._maxs = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._seq = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def push(self, value):
+        """Add a sample and evict the oldest one if the window is full
+        """
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+            self._values.append(value)
+            self._sum += value
+            self._sumsq += value * value
+            while self._mins and self._mins[-1][1] >= value:
+                self._mins.pop()
+            self._mins.append((seq, value))
+            while self._maxs and self._maxs[-1][1] <= value:
+                self._maxs.pop()
+            self._maxs.append((seq, value))
+            if len(self._values) > self.size:
+                old = self._values.popleft()
+                self._sum -= old
+                self._sumsq -= old * old
+                first = seq - self.size + 1
+                if self._mins[0][0] < first:
+                    self._mins.popleft()
+                if self._maxs[0][0] < first:
+                    self._maxs.popleft()
+                self._evicted += 1
+                if self._evicted >= self.size:
+                    #Resync the running sums once per window to stop the rounding drift.
+                    #It is amortized to O(1) per sample
+                    self._evicted = 0
+                    self._sum = math.fsum(self._values)
+                    self._sumsq = math.fsum(v * v for v in self._values)
+
+    def stats(self):
+        """Return a dict of the statistics of the window or None if it is empty
+        """
+        with self._lock:
+            count = len(self._values)
+            if count == 0:
+                return None
+            vmin = self._mins[0][1]
+            vmax = self._maxs[0][1]
+            return {
+                'mean': self._sum / count,
+                'min': vmin,
+                'max': vmax,
+                'rms': math.sqrt(max(0.0, self._sumsq / count)),
+                'p2p': vmax - vmin,
+            }
+
+    def get(self, stat):
+        """Return one of STATS or None if the window is empty
+        """
+        stats = self.stats()
+        return None if stats is None else stats[stat]
+
+    def clear(self):
+        """Empty the window
+        """
+        with self._lock:
+            self._values.clear()
+            self._mins.clear()
+            self._maxs.clear()
+            self._sum = 0.0
+            self._sumsq = 0.0
+            self._evicted = 0
+
+class AngleAggregator(object):
+    """Sliding window statistics of an angle in degrees, which wraps around 0/360
+
+    The mean is the circular mean, from running sums of the sines and cosines.
+    The spread is computed on the angles unwrapped from one sample to the next,
+    so an angle jittering around 0 has a small p2p : min and max are wrapped
+    back to [0, 360) and rms is the RMS deviation from the mean.
+    """
+
+    def __init__(self, size):
+        """
+        :param size: the number of samples in the window
+        """
+        self.size = max(1, size)
+        self._unwrapped = WindowAggregator(size)
+        self._sincos = deque()
+        self._sin = 0.0
+        self._cos = 0.0
+        #The last (angle, unwrapped angle)
+        self._last = None
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._unwrapped)
+
+    def push(self, value):
+        """Add a sample and evict the oldest one if the window is full
+        """
+        with self._lock:
+            if self._last is None:
+                unwrapped = value
+            else:
+                angle, previous = self._last
+                unwrapped = previous + (value - angle + 180.0) % 360.0 - 180.0
+            self._last = (value, unwrapped)
+            self._unwrapped.push(unwrapped)
+            rad = math.radians(value)
+            sin, cos = math.sin(rad), math.cos(rad)
+            self._sincos.append((sin, cos))
+            self._sin += sin
+            self._cos += cos
+            if len(self._sincos) > self.size:
+                sin, cos = self._sincos.popleft()
+                self._sin -= sin
+                self._cos -= cos
+                self._evicted += 1
+                if self._evicted >= self.size:
+                    self._evicted = 0
+                    self._sin = math.fsum(sin for sin, cos in self._sincos)
+                    self._cos = math.fsum(cos for sin, cos in self._sincos)
+
+    def stats(self):
+        """Return a dict of the statistics of the window or None if it is empty
+        """
+        with self._lock:
+            stats = self._unwrapped.stats()
+            if stats is None:
+                return None
+            return {
+                'mean': math.degrees(math.atan2(self._sin, self._cos)) % 360.0,
+                'min': stats['min'] % 360.0,
+                'max': stats['max'] % 360.0,
+                'rms': math.sqrt(max(0.0, stats['rms'] ** 2 - stats['mean'] ** 2)),
+                'p2p': min(360.0, stats['p2p']),
+            }
+
+    def get(self, stat):
+        """Return one of STATS or None if the window is empty
+        """
+        stats = self.stats()
+        return None if stats is None else stats[stat]
+
+    def clear(self):
+        """Empty the window
+        """
+        with self._lock:
+            self._unwrapped.clear()
+            self._sincos.clear()
+            self._sin = 0.0
+            self._cos = 0.0
+            self._last = None
+            self._evicted = 0
+
+#The aggregated channels which are angles
+ANGLES = ('heading',)
+
+def make_aggregator(name, size):
+    """Return the aggregator of the aggregated channel name
+    """
+    if name in ANGLES:
+        return AngleAggregator(size)
+    return WindowAggregator(size)
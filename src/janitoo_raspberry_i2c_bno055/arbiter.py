@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""The bus arbiter
+
+Schedule the accesses of the BNO055 clients to an I2C bus on top of its
+lock. When the bus is busy, the waiting clients are served by :
+
+ - budget : the clients which used more than their share of the bus time
+   in the last window wait for the others
+ - priority : the highest first
+ - deadline : the earliest first, for the periodic reads of the acquisition
+
+The other components of the bus still use the lock of the bus directly :
+the arbiter only orders the BNO055 clients between them, then takes
+the lock of the bus like everybody.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+import heapq
+import itertools
+import threading
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+from janitoo_raspberry_i2c_bno055.stats import Histogram
+
+#The window (in seconds) of the budgets
+BUDGET_WINDOW = 1.0
+
+NO_DEADLINE = float('inf')
+
+class BusClient(object):
+    """A client of a BusArbiter. It has the interface of the bus
+    (i2c_acquire/i2c_release), so it can replace it
+    """
+
+    def __init__(self, arbiter, name, priority=0, budget=0.0, deadline=None):
+        """
+        :param arbiter: the BusArbiter
+        :param name: the name of the client, for the logs
+        :param priority: the higher first
+        :param budget: the max share (0 to 1) of the bus time in a window before
+            giving the way to the other clients. 0 for no limit
+        :param deadline: a callable returning the time (monotonic) before which
+            the next access should end, or None
+        """
+        self.arbiter = arbiter
+        self.name = name
+        self.priority = priority
+        self.budget = budget
+        self.deadline = deadline
+        #The wait for the arbiter and the lock of the bus
+        self.waits = Histogram()
+        #The accesses delayed because the budget was exhausted
+        self.deferred = 0
+        self._used = 0.0
+        self._window = None
+        self._granted = None
+
+    def over_budget(self, now):
+        """True if the client used more than its budget in the current window
+        """
+        if not self.budget:
+            return False
+        if self._window is None or now - self._window >= BUDGET_WINDOW:
+            self._window = now
+            self._used = 0.0
+        return self._used >= self.budget * BUDGET_WINDOW
+
+    def i2c_acquire(self):
+        self.arbiter.acquire(self)
+
+    def i2c_release(self):
+        self.arbiter.release(self)
+
+    def get_busnum(self):
+        return self.arbiter.bus.get_busnum()
+
+    def __repr__(self):
+        return "<BusClient %s priority:%s budget:%s>" % (self.name, self.priority, self.budget)
+
+class BusArbiter(object):
+    """Grant the lock of a bus to its clients, one at a time
+    """
+
+    def __init__(self, bus):
+        """
+        :param bus: the object holding the lock of the bus (i2c_acquire/i2c_release)
+        """
+        self.bus = bus
+        self._cond = threading.Condition(threading.Lock())
+        self._queue = []
+        self._owner = None
+        self._seq = itertools.count()
+
+    def client(self, name, priority=0, budget=0.0, deadline=None):
+        """Return a new client of the bus
+        """
+        return BusClient(self, name, priority=priority, budget=budget, deadline=deadline)
+
+    def acquire(self, client):
+        """Wait for the turn of client, then for the lock of the bus
+        """
+        start = monotonic()
+        deadline = client.deadline() if client.deadline is not None else None
+        with self._cond:
+            over = client.over_budget(start)
+            if self._owner is None and not self._queue:
+                #Fast path : nobody is waiting
+                self._owner = client
+            else:
+                if over:
+                    client.deferred += 1
+                entry = (over, -client.priority, NO_DEADLINE if deadline is None else deadline, next(self._seq), client)
+                heapq.heappush(self._queue, entry)
+                while self._owner is not None or self._queue[0] is not entry:
+                    self._cond.wait()
+                heapq.heappop(self._queue)
+                self._owner = client
+        try:
+            self.bus.i2c_acquire()
+        except Exception:
+            self._next(client, 0.0)
+            raise
+        client._granted = monotonic()
+        client.waits.record(client._granted - start)
+
+    def release(self, client):
+        """Release the lock of the bus and give the turn to the next client
+        """
+        self.bus.i2c_release()
+        self._next(client, monotonic() - client._granted)
+
+    def _next(self, client, held):
+        with self._cond:
+            client._used += held
+            self._owner = None
+            self._cond.notify_all()
+
+_arbiters = {}
+_arbiters_lock = threading.Lock()
+
+def get_arbiter(bus):
+    """Return the BusArbiter of bus, shared by all the components of the process
+    """
+    with _arbiters_lock:
+        entry = _arbiters.get(id(bus))
+        if entry is None or entry.bus is not bus:
+            entry = _arbiters[id(bus)] = BusArbiter(bus)
+        return entry
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""The sensor backends
+
+The component talks to the chip through a BNO055 like object. The
+adafruit backend is the real driver. The sim backend is an in-memory
+register map with a per transaction latency, which can replay recorded
+frame traces : it runs the component on any machine.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import logging
+logger = logging.getLogger(__name__)
+import math
+import time
+import binascii
+import threading
+
+from janitoo_raspberry_i2c_bno055.frame import BNO055_DATA_ADDR, BNO055_DATA_LEN, FRAME_STRUCT, monotonic
+from janitoo_raspberry_i2c_bno055 import chip
+
+BACKENDS = ('adafruit', 'sim')
+
+#Time of one byte on a 400 kHz bus (8 bits and the ack)
+BYTE_TIME = 9.0 / 400000
+
+def read_trace(path):
+    """Read a trace file : one data block per line, hex encoded.
+    Empty lines and lines starting with # are ignored.
+    """
+    frames = []
+    with open(path, 'r') as ftrace:
+        for line in ftrace:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            data = bytearray(binascii.unhexlify(line))
+            if len(data) != BNO055_DATA_LEN:
+                raise ValueError('Bad frame length %s in %s' % (len(data), path))
+            frames.append(data)
+    return frames
+
+def write_trace(path, frames):
+    """Write data blocks to a trace file
+    """
+    with open(path, 'w') as ftrace:
+        for data in frames:
+            ftrace.write('%s\n' % binascii.hexlify(bytes(bytearray(data))).decode('ascii'))
+
+def synthetic_frame(elapsed):
+    """Return the data block of a chip lying flat and slowly turning
+    """
+    heading = (elapsed * 10.0) % 360
+    wobble = math.sin(elapsed * 2 * math.pi)
+    raw = [0] * 23
+    raw[2] = 981 + int(5 * wobble)
+    raw[8] = 160
+    raw[9] = int(heading * 16)
+    raw[12] = 1 << 14
+    raw[18] = int(5 * wobble)
+    raw[21] = 981
+    raw[22] = 25
+    return bytearray(FRAME_STRUCT.pack(*raw))
+
+class SimBNO055(object):
+    """A simulated BNO055 with the interface of Adafruit_BNO055.BNO055
+
+    The data registers are refreshed at rate Hz, from the trace or from
+    synthetic_frame(). Every transaction sleeps latency seconds plus the
+    time of the bytes on the bus.
+    """
+
+    def __init__(self, rst=None, address=0x28, i2c=None, busnum=None,
+                 latency=0.0002, trace=None, rate=100.0, **kwargs):
+        #There is no reset pin to drive
+        self._rst = None
+        self._gpio = None
+        self._mode = chip.OPERATION_MODE_NDOF
+        self.address = address
+        self.latency = latency
+        self.rate = rate
+        self.frames = read_trace(trace) if trace else None
+        self.regs = bytearray(0x80)
+        self.regs[chip.BNO055_CHIP_ID_ADDR] = chip.BNO055_ID
+        self.page1 = bytearray(0x80)
+        self.transactions = 0
+        self._start = monotonic()
+        self._lock = threading.Lock()
+
+    def _transaction(self, length):
+        self.transactions += 1
+        delay = self.latency + length * BYTE_TIME
+        if delay > 0:
+            time.sleep(delay)
+
+    def _refresh(self):
+        elapsed = monotonic() - self._start
+        if self.frames:
+            data = self.frames[int(elapsed * self.rate) % len(self.frames)]
+        else:
+            data = synthetic_frame(elapsed)
+        self.regs[BNO055_DATA_ADDR:BNO055_DATA_ADDR + BNO055_DATA_LEN] = data
+        #Fully calibrated
+        self.regs[chip.BNO055_CALIB_STAT_ADDR] = 0xFF
+
+    def _write_bytes(self, address, data, ack=True):
+        self._transaction(len(data) + 1)
+        with self._lock:
+            regs = self.page1 if self.regs[chip.BNO055_PAGE_ID_ADDR] == 1 else self.regs
+            regs[address:address + len(data)] = bytearray(data)
+
+    def _write_byte(self, address, value, ack=True):
+        self._transaction(2)
+        with self._lock:
+            if address == chip.BNO055_PAGE_ID_ADDR:
+                self.regs[address] = value & 0xFF
+            elif self.regs[chip.BNO055_PAGE_ID_ADDR] == 1:
+                self.page1[address] = value & 0xFF
+            elif address == chip.BNO055_SYS_TRIGGER_ADDR and value & chip.SYS_TRIGGER_RST_INT:
+                self.regs[chip.BNO055_INT_STA_ADDR] = 0
+            else:
+                self.regs[address] = value & 0xFF
+
+    def interrupt(self, status):
+        """Raise the interrupts of status if they are enabled. Return True if
+        the INT pin goes high
+        """
+        with self._lock:
+            status &= self.page1[chip.BNO055_INT_EN_ADDR]
+            self.regs[chip.BNO055_INT_STA_ADDR] |= status
+            return bool(status & self.page1[chip.BNO055_INT_MSK_ADDR])
+
+    def _read_bytes(self, address, length):
+        self._transaction(length + 1)
+        with self._lock:
+            self._refresh()
+            return bytearray(self.regs[address:address + length])
+
+    def _read_byte(self, address):
+        return self._read_bytes(address, 1)[0]
+
+    def _read_signed_byte(self, address):
+        data = self._read_byte(address)
+        return data - 256 if data > 127 else data
+
+    def begin(self, mode=chip.OPERATION_MODE_NDOF):
+        self._mode = mode
+        self.set_mode(mode)
+        return True
+
+    def set_mode(self, mode):
+        self._write_byte(chip.BNO055_OPR_MODE_ADDR, mode)
+
+    def read_temp(self):
+        return self._read_signed_byte(BNO055_DATA_ADDR + BNO055_DATA_LEN - 1)
+
+    def get_calibration_status(self):
+        cal_status = self._read_byte(chip.BNO055_CALIB_STAT_ADDR)
+        return ((cal_status >> 6) & 0x03, (cal_status >> 4) & 0x03,
+                (cal_status >> 2) & 0x03, cal_status & 0x03)
+
+    def get_calibration(self):
+        return list(self._read_bytes(chip.BNO055_CALIB_ADDR, chip.BNO055_CALIB_LEN))
+
+    def set_calibration(self, data):
+        if data is None or len(data) != chip.BNO055_CALIB_LEN:
+            raise ValueError('Expected a list of 22 bytes for calibration data.')
+        self._write_bytes(chip.BNO055_CALIB_ADDR, data)
+
+def get_sensor_class(backend):
+    """Return the class of a backend. The hardware driver is imported on demand
+    """
+    if backend == 'sim':
+        return SimBNO055
+    if backend == 'adafruit':
+        from Adafruit_BNO055 import BNO055
+        return BNO055.BNO055
+    raise ValueError('Unknown backend %s' % backend)
+
+def make_sensor(backend, rst=None, address=0x28, i2c=None, busnum=None, **sim_options):
+    """Create the sensor object of a backend. sim_options are only given to the sim backend
+    """
+    sensor_class = get_sensor_class(backend)
+    if backend == 'sim':
+        return sensor_class(rst=rst, address=address, i2c=i2c, busnum=busnum, **sim_options)
+    return sensor_class(rst=rst, address=address, i2c=i2c, busnum=busnum)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""The benchmark of the component
+
+Run the value callbacks of BNOComponent against the simulated chip on a
+simulated I2C bus, alone and with sibling components contending for the
+bus lock. Report latencies, throughput, lock wait times and the load time
+of the entry point as JSON.
+
+    python -m janitoo_raspberry_i2c_bno055.bench --duration 5 --output bench.json
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import sys
+import json
+import platform
+import argparse
+import threading
+import subprocess
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+from janitoo_raspberry_i2c_bno055.backend import make_sensor
+from janitoo_raspberry_i2c_bno055 import chip
+
+def percentile(values, pct):
+    """Return the nearest rank percentile of a list of values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = int(round(pct / 100.0 * (len(ordered) - 1)))
+    return ordered[rank]
+
+class SimI2CBus(object):
+    """An I2C bus with the lock interface of janitoo_raspberry_i2c.bus_i2c.I2CBus
+    recording the time spent waiting for the lock
+    """
+    oid = 'rpii2c'
+    nodeman = None
+
+    def __init__(self, busnum=1):
+        self.busnum = busnum
+        self.waits = []
+        self._lock = threading.Lock()
+
+    def i2c_acquire(self, blocking=True):
+        start = monotonic()
+        ret = self._lock.acquire(blocking)
+        self.waits.append(monotonic() - start)
+        return ret
+
+    def i2c_release(self):
+        self._lock.release()
+
+    def get_adafruit_i2c(self):
+        return None
+
+    def get_busnum(self):
+        return self.busnum
+
+def make_component(bus, addr, latency, cache_max_age, options=None):
+    """Create a BNOComponent bound to a simulated chip, without starting it
+    """
+    from janitoo.options import JNTOptions
+    from janitoo_raspberry_i2c_bno055.bno import make_bno
+    component = make_bno(bus=bus, addr=addr, options=JNTOptions(options or {}))
+    sensor = make_sensor('sim', latency=latency)
+    chip.begin(sensor, bus, sleep=lambda delay: None)
+    component.devices[0].sensor = sensor
+    component.cache.max_age = cache_max_age
+    return component
+
+def poll_loop(component, channels, duration, latencies):
+    """Call the callbacks of channels in turn for duration seconds
+    """
+    callbacks = [component.channel_cb(name) for name in channels]
+    end = monotonic() + duration
+    while monotonic() < end:
+        for callback in callbacks:
+            start = monotonic()
+            callback(component.uuid, 0)
+            latencies.append(monotonic() - start)
+
+def run_scenario(siblings, duration, channels, latency=0.0002, cache_max_age=0.0):
+    """Poll one component with siblings other components on the same bus
+    """
+    bus = SimI2CBus()
+    components = [make_component(bus, 'bno%s' % i, latency, cache_max_age) for i in range(siblings + 1)]
+    bus.waits = []
+    results = [[] for component in components]
+    threads = [threading.Thread(target=poll_loop, args=(component, channels, duration, result))
+               for component, result in zip(components, results)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies = results[0]
+    to_ms = lambda value: None if value is None else value * 1000.0
+    return {
+        'siblings': siblings,
+        'channels': list(channels),
+        'cache_max_age': cache_max_age,
+        'sim_latency': latency,
+        'reads': len(latencies),
+        'reads_per_s': len(latencies) / duration,
+        'bus_reads_per_s': sum(len(result) for result in results) / duration,
+        'latency_p50_ms': to_ms(percentile(latencies, 50)),
+        'latency_p99_ms': to_ms(percentile(latencies, 99)),
+        'latency_max_ms': to_ms(max(latencies) if latencies else None),
+        'lock_wait_total_s': sum(bus.waits),
+        'lock_wait_p50_ms': to_ms(percentile(bus.waits, 50)),
+        'lock_wait_p99_ms': to_ms(percentile(bus.waits, 99)),
+        'cache_hits': components[0].cache.hits,
+        'cache_misses': components[0].cache.misses,
+    }
+
+#Load the entry point in a fresh interpreter. Print the load time and the
+#modules of the arguments which were imported
+STARTUP_SCRIPT = """
+import sys, time
+from pkg_resources import iter_entry_points
+ep = next(iter_entry_points('janitoo.components', name='rpii2c.bno'))
+start = time.time()
+ep.load()
+print(time.time() - start)
+print(','.join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+def measure_startup(modules=()):
+    """Load the rpii2c.bno entry point in a fresh interpreter (the package must
+    be installed). Return the load time in seconds and the names of modules
+    which were imported
+    """
+    output = subprocess.check_output([sys.executable, '-c', STARTUP_SCRIPT] + list(modules))
+    lines = output.decode('utf-8').splitlines()
+    return float(lines[0]), [name for name in lines[1].split(',') if name]
+
+def run(duration=2.0, siblings=(0, 1, 3, 7), channels=None, latency=0.0002, cache_max_age=0.0, startup=True):
+    """Run all the scenarios and return the report
+    """
+    if channels is None:
+        from janitoo_raspberry_i2c_bno055.bno import VALUES
+        channels = ['temperature'] + [uuid for uuid, help, label in VALUES]
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'duration': duration,
+        'startup_s': measure_startup()[0] if startup else None,
+        'scenarios': [run_scenario(count, duration, channels, latency, cache_max_age)
+                      for count in siblings],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the BNO055 component on a simulated bus')
+    parser.add_argument('--duration', type=float, default=2.0, help='duration of a scenario in seconds')
+    parser.add_argument('--siblings', default='0,1,3,7', help='comma separated numbers of sibling components')
+    parser.add_argument('--channels', default=None, help='comma separated channels to read')
+    parser.add_argument('--latency', type=float, default=0.0002, help='latency of a simulated transaction')
+    parser.add_argument('--cache', type=float, default=0.0, help='max age of the frame cache')
+    parser.add_argument('--no-startup', action='store_true', help="don't measure the load time of the entry point")
+    parser.add_argument('--output', default=None, help='the JSON file of the report. stdout if empty')
+    args = parser.parse_args(argv)
+    report = run(duration=args.duration,
+        siblings=[int(count) for count in args.siblings.split(',')],
+        channels=args.channels.split(',') if args.channels else None,
+        latency=args.latency, cache_max_age=args.cache, startup=not args.no_startup)
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as fout:
+            fout.write(data)
+    else:
+        sys.stdout.write(data + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -28,18 +28,12 @@ __copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi2100
 
 import logging
 logger = logging.getLogger(__name__)
-import os, sys
+import os
+import time
 import threading
+import functools
 
-from janitoo.thread import JNTBusThread, BaseThread
-from janitoo.options import get_option_autostart
-from janitoo.utils import HADD
-from janitoo.node import JNTNode
-from janitoo.value import JNTValue
 from janitoo.component import JNTComponent
-from janitoo_raspberry_i2c.bus_i2c import I2CBus
-
-from Adafruit_BNO055 import BNO055
 
 ##############################################################
 #Check that we are in sync with the official command classes
@@ -57,6 +51,50 @@ assert(COMMAND_DESC[COMMAND_DOC_RESOURCE] == 'COMMAND_DOC_RESOURCE')
 
 from janitoo_raspberry_i2c import OID
 
+from janitoo_raspberry_i2c_bno055.frame import BNO055_DATA_ADDR, BNO055_DATA_LEN, decode_frame, monotonic
+from janitoo_raspberry_i2c_bno055.clock import WallClock
+from janitoo_raspberry_i2c_bno055.cache import FrameCache
+from janitoo_raspberry_i2c_bno055.acquisition import FrameRing, AcquisitionThread
+from janitoo_raspberry_i2c_bno055.aggregate import AGGREGATES, STATS, make_aggregator
+from janitoo_raspberry_i2c_bno055.features import FEATURES, COUNTS, FeatureExtractor
+from janitoo_raspberry_i2c_bno055.publish import Deadband, FrameBatcher, BrokerLink, encode_batch, BATCH_MAX_FRAMES
+from janitoo_raspberry_i2c_bno055 import chip
+from janitoo_raspberry_i2c_bno055.backend import make_sensor
+from janitoo_raspberry_i2c_bno055.device import BNODevice, parse_devices
+from janitoo_raspberry_i2c_bno055.recovery import Recovery, ThrottledLog
+from janitoo_raspberry_i2c_bno055.stats import I2CStats, READS, ERRORS, RETRIES, BYTES, STALE
+#The optional features (spool, triggers, interrupts, arbiter, power policy) and the
+#hardware drivers are imported when they are enabled, to keep the startup of the node short
+
+#The channels of the data block published as values
+#(uuid, help, label)
+VALUES = (
+    ('heading', 'The heading (euler angle in degrees)', 'Heading'),
+    ('roll', 'The roll (euler angle in degrees)', 'Roll'),
+    ('pitch', 'The pitch (euler angle in degrees)', 'Pitch'),
+    ('accel_x', 'The acceleration on X axis (in m/s²)', 'Accel X'),
+    ('accel_y', 'The acceleration on Y axis (in m/s²)', 'Accel Y'),
+    ('accel_z', 'The acceleration on Z axis (in m/s²)', 'Accel Z'),
+    ('gyro_x', 'The angular rate on X axis (in degrees/s)', 'Gyro X'),
+    ('gyro_y', 'The angular rate on Y axis (in degrees/s)', 'Gyro Y'),
+    ('gyro_z', 'The angular rate on Z axis (in degrees/s)', 'Gyro Z'),
+)
+
+#The channels which can be published on change
+DEADBAND_VALUES = ('temperature',) + tuple(uuid for uuid, help, label in VALUES)
+
+#The settings applied live : (method applying them, config values)
+RELOADABLE = (
+    ('apply_rate', ('sample_rate',)),
+    ('start_windows', ('window_size',)),
+    ('start_deadbands', ('max_silence',) + tuple('%s_deadband%s' % (uuid, suffix)
+        for uuid in DEADBAND_VALUES for suffix in ('', '_rel'))),
+    ('start_features', ('feature_window', 'step_threshold', 'step_interval', 'impact_threshold',
+        'vibration_low', 'vibration_high')),
+    ('start_triggers', ('triggers', 'trigger_pre', 'trigger_post', 'trigger_holdoff', 'trigger_channels')),
+    ('apply_mode', ('operation_mode', 'power_mode')),
+)
+
 def make_bno(**kwargs):
     return BNOComponent(**kwargs)
 
@@ -68,8 +106,8 @@ class BNOComponent(JNTComponent):
         """
         oid = kwargs.pop('oid', '%s.bno'%OID)
         name = kwargs.pop('name', "Input")
-        product_name = kwargs.pop('product_name', "BMP")
-        product_type = kwargs.pop('product_type', "Temperature/altitude/pressure sensor")
+        product_name = kwargs.pop('product_name', "BNO055")
+        product_type = kwargs.pop('product_type', "Absolute orientation sensor")
         JNTComponent.__init__(self, oid=oid, bus=bus, addr=addr, name=name,
                 product_name=product_name, product_type=product_type, **kwargs)
         logger.debug("[%s] - __init__ node uuid:%s", self.__class__.__name__, self.uuid)
@@ -88,6 +126,462 @@ class BNOComponent(JNTComponent):
             label='Rst pin',
             default=None,
         )
+        uuid="operation_mode"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The operation mode of the chips : ndof, ndof_fmc_off, imuplus, compass, m4g or a non fusion mode (acconly, magonly, gyroonly, accmag, accgyro, maggyro, amg)',
+            label='Mode',
+            default='ndof',
+        )
+        uuid="power_mode"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The power mode of the chips : normal, lowpower or suspend',
+            label='Power',
+            default='normal',
+        )
+        uuid="idle_timeout"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The time (in seconds) without activity before the chips go to idle_power_mode and the acquisition to idle_sample_rate. 0 to disable it',
+            label='Idle timeout',
+            default=0.0,
+        )
+        uuid="idle_sample_rate"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The sample rate (in Hz) of the acquisition when idle',
+            label='Idle rate',
+            default=1.0,
+        )
+        uuid="idle_power_mode"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The power mode of the chips when idle : normal or lowpower. Not suspend : the chips would not report the activity waking them',
+            label='Idle power',
+            default='lowpower',
+        )
+        uuid="activity_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The deviation of the acceleration from the gravity (in m/s²) which wakes the node',
+            label='Activity',
+            default=0.5,
+        )
+        uuid="idle"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='1 when the node is idle, 0 when it is active. Published on change, needs idle_timeout',
+            label='Idle',
+            get_data_cb=self.idle_data,
+        )
+        uuid="int_pin"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The GPIO connected to the INT pin of the main BNO055. The sampling only runs when the chip detects a motion',
+            label='Int pin',
+            default=None,
+        )
+        uuid="any_motion_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The acceleration (in g) of the any motion interrupt. 0 to disable it',
+            label='Any motion',
+            default=0.1,
+        )
+        uuid="no_motion_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The acceleration (in g) under which the no motion interrupt is raised. 0 to disable it',
+            label='No motion',
+            default=0.05,
+        )
+        uuid="no_motion_delay"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The time (1 to 16 seconds) without motion before the no motion interrupt',
+            label='No motion delay',
+            default=5,
+        )
+        uuid="high_g_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The acceleration (in g) of the high g interrupt. 0 to disable it',
+            label='High g',
+            default=3.0,
+        )
+        uuid="motion"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='1 when the chip detects a motion, 0 when it does not. Published on change, needs int_pin',
+            label='Motion',
+            get_data_cb=self.motion_data,
+        )
+        uuid="interrupts"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of interrupts of the chip',
+            label='Interrupts',
+            get_data_cb=self.interrupts_data,
+        )
+        uuid="backend"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The sensor backend : adafruit (the chip) or sim (a simulated chip)',
+            label='Backend',
+            default='adafruit',
+        )
+        uuid="sim_trace"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The trace file replayed by the sim backend. Synthetic data if empty',
+            label='Trace',
+            default=None,
+        )
+        uuid="sim_latency"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The latency (in seconds) of an I2C transaction of the sim backend',
+            label='Latency',
+            default=0.0002,
+        )
+        uuid="devices"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The other BNO055 driven by the component, on its bus : comma separated addresses like 0x29. Their values use the next indexes',
+            label='Devices',
+            default='',
+        )
+        uuid="cache_max_age"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max age (in seconds) of a frame served from the cache. 0 to disable it',
+            label='Cache',
+            default=0.5,
+        )
+        uuid="sample_rate"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The rate (in Hz) of the acquisition thread. 0 to disable it and read the sensor on poll',
+            label='Rate',
+            default=0.0,
+        )
+        uuid="ring_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames kept by the acquisition thread',
+            label='Ring',
+            default=1000,
+        )
+        uuid="window_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of samples of the aggregation window',
+            label='Window',
+            default=100,
+        )
+        uuid="max_silence"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max delay (in seconds) without publishing a value with a deadband. 0 to disable it',
+            label='Silence',
+            default=300.0,
+        )
+        uuid="stream_batch_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames published in a stream batch (up to 65535). 0 to disable streaming',
+            label='Batch',
+            default=0,
+        )
+        uuid="stream_max_latency"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max delay (in seconds) before publishing an incomplete stream batch',
+            label='Latency',
+            default=1.0,
+        )
+        uuid="stream_format"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The format of the stream batches : binary (base64 packed records) or json (columnar lists)',
+            label='Format',
+            default='binary',
+        )
+        uuid="stream_channels"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The comma separated channels of the stream batches',
+            label='Channels',
+            default='accel_x,accel_y,accel_z,gyro_x,gyro_y,gyro_z',
+        )
+        uuid="stream"
+        self.values[uuid] = self.value_factory['sensor_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The last batch of frames. Published when full, needs the acquisition thread',
+            label='Stream',
+            get_data_cb=self.stream,
+        )
+        uuid="triggers"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The comma separated trigger rules <channel><op><threshold>, op one of > < ^ (step), like accel_magnitude>2g,gyro_magnitude>250,temperature^2. Needs the acquisition thread',
+            label='Triggers',
+            default='',
+        )
+        uuid="trigger_pre"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames before the trigger in an event',
+            label='Pre trigger',
+            default=50,
+        )
+        uuid="trigger_post"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames after the trigger in an event',
+            label='Post trigger',
+            default=50,
+        )
+        uuid="trigger_holdoff"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The min delay (in seconds) between the end of an event and the next trigger',
+            label='Holdoff',
+            default=1.0,
+        )
+        uuid="trigger_channels"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The comma separated channels of the events',
+            label='Event channels',
+            default='accel_x,accel_y,accel_z,gyro_x,gyro_y,gyro_z',
+        )
+        uuid="event"
+        self.values[uuid] = self.value_factory['sensor_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The last event : the rule, the device and the frames around the trigger as json. Published when captured',
+            label='Event',
+            get_data_cb=self.event,
+        )
+        uuid="events"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of events captured',
+            label='Events',
+            get_data_cb=self.events,
+        )
+        uuid="spool_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max size (in MB) of the spool of the frames in home_dir, used to backfill them when the broker comes back. Needs the acquisition thread. 0 to disable it',
+            label='Spool size',
+            default=0,
+        )
+        uuid="spool_segment_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames of a segment file of the spool',
+            label='Segment size',
+            default=65536,
+        )
+        uuid="spool_channels"
+        self.values[uuid] = self.value_factory['config_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The comma separated channels of the spool',
+            label='Spool channels',
+            default='accel_x,accel_y,accel_z,gyro_x,gyro_y,gyro_z',
+        )
+        uuid="spool_flush_interval"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The interval (in seconds) between two writes of the spool to the disk',
+            label='Spool flush',
+            default=10.0,
+        )
+        uuid="backfill_batch_size"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames of the backfill batches',
+            label='Backfill batch',
+            default=500,
+        )
+        uuid="backfill"
+        self.values[uuid] = self.value_factory['sensor_string'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The last batch of spooled frames sent when the broker came back, in the format of the stream',
+            label='Backfill',
+            get_data_cb=self.backfill_data,
+        )
+        uuid="read_retries"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of retries of a failed block read',
+            label='Retries',
+            default=1,
+        )
+        uuid="failure_threshold"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of consecutive failed reads before a chip is considered down and re-initialized',
+            label='Failures',
+            default=3,
+        )
+        uuid="backoff_max"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max delay (in seconds) between two re-initializations of a chip which is down',
+            label='Backoff',
+            default=300.0,
+        )
+        uuid="log_interval"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The min delay (in seconds) between two tracebacks of the same chip in the log',
+            label='Log',
+            default=60.0,
+        )
+        uuid="feature_window"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of frames of the windows of the motion features (needs sample_rate and numpy). 0 to disable them',
+            label='Features',
+            default=0,
+        )
+        uuid="step_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The min linear acceleration (in m/s²) of a step',
+            label='Step threshold',
+            default=1.5,
+        )
+        uuid="step_interval"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The min delay (in seconds) between two steps',
+            label='Step interval',
+            default=0.3,
+        )
+        uuid="impact_threshold"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The acceleration magnitude (in g) of an impact',
+            label='Impact threshold',
+            default=4.0,
+        )
+        uuid="vibration_low"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The low frequency (in Hz) of the vibration band',
+            label='Vibration low',
+            default=5.0,
+        )
+        uuid="vibration_high"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The high frequency (in Hz) of the vibration band',
+            label='Vibration high',
+            default=50.0,
+        )
+        uuid="bus_priority"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The priority of the chips of the component between the BNO055 components of the same bus, the higher first. Empty to use the lock of the bus directly',
+            label='Bus priority',
+            default=None,
+        )
+        uuid="bus_budget"
+        self.values[uuid] = self.value_factory['config_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The max share (0 to 1) of the bus time used by the component each second before giving the way to the other BNO055 components. 0 for no limit',
+            label='Bus budget',
+            default=0.0,
+        )
+        uuid="reload_interval"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The interval (in seconds) between two checks of the sampling settings (rate, windows, deadbands, features, triggers and modes) to apply their changes live. 0 to disable it',
+            label='Reload',
+            default=5,
+        )
+        uuid="stats_log_interval"
+        self.values[uuid] = self.value_factory['config_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The interval (in seconds) between two dumps of the I2C statistics in the log. 0 to disable it',
+            label='Stats log',
+            default=0,
+        )
+        for uuid, counter, help in (
+                ('i2c_reads', READS, 'The number of block reads'),
+                ('i2c_errors', ERRORS, 'The number of failed block reads'),
+                ('i2c_retries', RETRIES, 'The number of retried block reads'),
+                ('i2c_bytes', BYTES, 'The number of bytes read'),
+                ('stale_serves', STALE, 'The number of values served from a late frame of the acquisition thread'),
+                ):
+            self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+                node_uuid=self.uuid,
+                help=help,
+                label=uuid,
+                get_data_cb=self.counter_cb(counter),
+            )
+        for uuid, histogram, help in (
+                ('lock_wait', 'lock_wait', 'the wait for the I2C bus lock'),
+                ('i2c_time', 'transaction', 'the block reads'),
+                ):
+            for stat in ('avg', 'p99', 'max'):
+                self.values['%s_%s' % (uuid, stat)] = self.value_factory['sensor_float'](options=self.options,
+                    uuid='%s_%s' % (uuid, stat),
+                    node_uuid=self.uuid,
+                    help='The %s duration (in ms) of %s' % (stat, help),
+                    label='%s %s' % (uuid, stat),
+                    get_data_cb=self.histogram_cb(histogram, stat),
+                )
+        uuid="achieved_rate"
+        self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The sample rate (in Hz) achieved by the acquisition thread over the last 10 seconds',
+            label='Rate',
+            get_data_cb=self.interval_cb('rate'),
+        )
+        poll_value = self.values[uuid].create_poll_value(default=300)
+        self.values[poll_value.uuid] = poll_value
+        uuid="jitter"
+        self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The standard deviation (in ms) of the intervals between two frames over the last 10 seconds',
+            label='Jitter',
+            get_data_cb=self.interval_cb('jitter'),
+        )
+        poll_value = self.values[uuid].create_poll_value(default=300)
+        self.values[poll_value.uuid] = poll_value
+        uuid="max_interval"
+        self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The longest interval (in ms) between two frames over the last 10 seconds',
+            label='Max interval',
+            get_data_cb=self.interval_cb('max_interval'),
+        )
+        uuid="missed_samples"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of samples missed by the acquisition thread',
+            label='Missed',
+            get_data_cb=self.interval_cb('missed'),
+        )
+        uuid="cache_hits"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of values served from the cache',
+            label='Hits',
+            get_data_cb=self.cache_hits,
+        )
+        uuid="cache_misses"
+        self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+            node_uuid=self.uuid,
+            help='The number of values read from the sensor',
+            label='Misses',
+            get_data_cb=self.cache_misses,
+        )
         uuid="temperature"
         self.values[uuid] = self.value_factory['sensor_temperature'](options=self.options, uuid=uuid,
             node_uuid=self.uuid,
@@ -97,41 +591,949 @@ class BNOComponent(JNTComponent):
         )
         poll_value = self.values[uuid].create_poll_value(default=300)
         self.values[poll_value.uuid] = poll_value
+        for uuid, help, label in VALUES:
+            self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+                node_uuid=self.uuid,
+                help=help,
+                label=label,
+                get_data_cb=self.channel_cb(uuid),
+            )
+            poll_value = self.values[uuid].create_poll_value(default=300)
+            self.values[poll_value.uuid] = poll_value
+        for uuid in DEADBAND_VALUES:
+            self.values['%s_deadband' % uuid] = self.value_factory['config_float'](options=self.options,
+                uuid='%s_deadband' % uuid,
+                node_uuid=self.uuid,
+                help='Publish %s when it moves past this absolute threshold. 0 to disable it' % uuid,
+                label='Deadband',
+                default=0.0,
+            )
+            self.values['%s_deadband_rel' % uuid] = self.value_factory['config_float'](options=self.options,
+                uuid='%s_deadband_rel' % uuid,
+                node_uuid=self.uuid,
+                help='Publish %s when it moves past this fraction of the last published value. 0 to disable it' % uuid,
+                label='Rel deadband',
+                default=0.0,
+            )
+        for uuid, help, label in FEATURES:
+            self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+                node_uuid=self.uuid,
+                help=help,
+                label=label,
+                get_data_cb=self.feature_cb(uuid),
+            )
+            poll_value = self.values[uuid].create_poll_value(default=300)
+            self.values[poll_value.uuid] = poll_value
+        for uuid, help, label in COUNTS:
+            self.values[uuid] = self.value_factory['sensor_integer'](options=self.options, uuid=uuid,
+                node_uuid=self.uuid,
+                help=help,
+                label=label,
+                get_data_cb=self.feature_cb(uuid),
+            )
+            poll_value = self.values[uuid].create_poll_value(default=300)
+            self.values[poll_value.uuid] = poll_value
+        for name, help, extract in AGGREGATES:
+            for stat in STATS:
+                uuid = "%s_%s" % (name, stat)
+                self.values[uuid] = self.value_factory['sensor_float'](options=self.options, uuid=uuid,
+                    node_uuid=self.uuid,
+                    help='The %s of %s over the window' % (stat, help),
+                    label='%s %s' % (name, stat),
+                    get_data_cb=self.aggregate_cb(name, stat),
+                )
+                poll_value = self.values[uuid].create_poll_value(default=300)
+                self.values[poll_value.uuid] = poll_value
 
-        self.sensor = None
+        self.mqttc = None
+        #The main device, on the bus of the component. The others are added on start
+        self.devices = [BNODevice(0, self._bus)]
+        self.devices[0].cache = FrameCache(functools.partial(self.read_frame, 0),
+            listener=functools.partial(self.poll_frame, 0))
+        self.cache = self.devices[0].cache
+        self.acquisition = None
+        self.deadbands = {}
+        self.batcher = None
+        self.stream_payload = None
+        self._streamer = None
+        self._stream_lock = threading.Lock()
+        self.event_payload = None
+        self.backfill_payload = None
+        self.spool = None
+        self._spooler = None
+        self.broker = BrokerLink()
+        self.clock = WallClock()
+        self._settings = {}
+        self._reloader = None
+        self.clients = []
+        self.power = None
+        self._mode = chip.OPERATION_MODE_NDOF
+        self._power_mode = chip.POWER_MODE_NORMAL
+        self._idle_power_mode = chip.POWER_MODE_LOWPOWER
+        self.int_pin = None
+        self.motion = threading.Event()
+        self._interrupts = 0
+        self._watcher = None
+        self._starter = None
+        self._stopevent = threading.Event()
+        self.stats = I2CStats()
+        self._read_retries = 1
+        self._stats_logged = monotonic()
+        self.throttled = ThrottledLog(logger)
 
-    def temperature(self, node_uuid, index):
-        self._bus.i2c_acquire()
+    @property
+    def sensor(self):
+        """The sensor of the main device
+        """
+        return self.devices[0].sensor
+
+    def _read_block(self, device):
+        """Read the data block of a device. The bus lock must be held.
+        Return (data, stamp of the middle of the read), (None, None) on error.
+        """
+        start = monotonic()
+        retries = self._read_retries
+        while True:
+            try:
+                before = monotonic()
+                data = device.sensor._read_bytes(BNO055_DATA_ADDR, BNO055_DATA_LEN)
+                break
+            except Exception:
+                if retries <= 0:
+                    self.stats.incr(ERRORS)
+                    self.throttled.exception(device.index, '[%s] - Exception when reading data block of %s', self.__class__.__name__, device)
+                    if device.recovery.failure():
+                        logger.warning('[%s] - %s is down, re-initialize it in %.1f s', self.__class__.__name__,
+                            device, device.recovery.next_attempt - monotonic())
+                    return None, None
+                retries -= 1
+                self.stats.incr(RETRIES)
+        end = monotonic()
+        self.stats.transfer(end - start, BNO055_DATA_LEN)
+        device.recovery.success()
+        return data, (before + end) / 2.0
+
+    def read_frame(self, index=0):
+        """Read the whole data block of a device in one I2C transaction
+        and decode it. Return None on error or if the device is not started.
+        """
+        self.recover()
+        device = self.devices[index]
+        if not device.readable:
+            return None
+        start = monotonic()
+        device.bus.i2c_acquire()
         try:
-            data = self.sensor.read_temp()
-            ret = float(data)
-        except Exception:
-            logger.exception('[%s] - Exception when retrieving temperature', self.__class__.__name__)
-            ret = None
+            self.stats.wait(monotonic() - start)
+            data, stamp = self._read_block(device)
         finally:
-            self._bus.i2c_release()
-        return ret
+            device.bus.i2c_release()
+        if data is None:
+            return None
+        device.frame = decode_frame(data, stamp)
+        return device.frame
+
+    def read_cycle(self):
+        """Read the data blocks of all the devices, taking the lock of
+        the bus once. Return the frames, None for the failed devices.
+        """
+        self.recover()
+        datas = [(None, None)] * len(self.devices)
+        devices = [device for device in self.devices if device.readable]
+        if devices:
+            bus = self.devices[0].bus
+            start = monotonic()
+            bus.i2c_acquire()
+            try:
+                self.stats.wait(monotonic() - start)
+                for device in devices:
+                    datas[device.index] = self._read_block(device)
+            finally:
+                bus.i2c_release()
+        frames = [None] * len(self.devices)
+        for device in self.devices:
+            data, stamp = datas[device.index]
+            if data is not None:
+                device.frame = frames[device.index] = decode_frame(data, stamp)
+        return frames
+
+    def recover(self):
+        """Re-initialize in the background the devices which are down, when their backoff is over
+        """
+        for device in self.devices:
+            if not device.recovery.due() or self._stopevent.is_set():
+                continue
+            if device.reinit is not None and device.reinit.is_alive():
+                continue
+            device.reinit = threading.Thread(target=self.start_device, args=(device,),
+                name="%s_reinit_%s" % (self.uuid, device.index))
+            device.reinit.daemon = True
+            device.reinit.start()
+
+    def poll_frame(self, index, frame):
+        """Process a frame read by the cache of a device, outside of the acquisition thread.
+        The frame is already cached : publishing the values does not read the bus again
+        """
+        self.on_frame(frame.stamp, frame, index)
+
+    def on_frame(self, stamp, frame, index=0):
+        """Called for every new frame. Deadbands and streaming only apply
+        to the main device.
+        """
+        device = self.devices[index]
+        device.intervals.record(stamp, self.acquisition.period if self.acquisition is not None else None)
+        for name, help, extract in AGGREGATES:
+            aggregator = device.aggregators.get(name)
+            if aggregator is not None:
+                aggregator.push(extract(frame))
+        if device.features is not None and device.features.due(device.ring):
+            device.features.update(device.ring)
+        if device.trigger is not None:
+            payload = device.trigger.process(stamp, frame, device.ring)
+            if payload is not None:
+                self.event_payload = payload
+                self.publish_value('event')
+        if index != 0:
+            return
+        if self.power is not None and self.power.update(frame, stamp):
+            self.apply_power()
+        for uuid, deadband in self.deadbands.items():
+            value = frame[uuid]
+            if deadband.check(value, stamp):
+                deadband.published(value, stamp)
+                self.publish_value(uuid)
+        if self.spool is not None:
+            self.spool.append(self.clock.wall(stamp), frame)
+        if self.batcher is not None:
+            self.publish_stream(self.batcher.add(stamp, frame))
+
+    def publish_stream(self, payload):
+        """Publish a batch of the stream. The payload and its publish are locked
+        together : a batch flushed by the timer can't hide another one
+        """
+        if payload is None:
+            return
+        with self._stream_lock:
+            self.stream_payload = payload
+            self.publish_value('stream')
+
+    def run_stream(self):
+        """Flush the stream batch when its oldest frame is too old, even when no
+        frame comes (paused sampling, chip down)
+        """
+        interval = max(0.05, self.batcher.max_latency / 4.0)
+        while not self._stopevent.wait(interval):
+            self.publish_stream(self.batcher.flush_due(monotonic()))
+
+    def publish_value(self, uuid):
+        """Push a value to the broker without waiting for its poll
+        """
+        if self.mqttc is None:
+            return
+        try:
+            self.broker.published(self._bus.nodeman.publish_poll(self.mqttc, self.values[uuid]))
+        except Exception:
+            self.broker.failed()
+            logger.exception('[%s] - Exception when publishing %s', self.__class__.__name__, uuid)
+
+    def broker_connected(self):
+        """Return True if the broker is reachable
+        """
+        if self.mqttc is None:
+            return False
+        return self.broker.is_connected()
+
+    def get_device(self, index):
+        """Return the device of the index of a value or None
+        """
+        index = index or 0
+        if index < 0 or index >= len(self.devices):
+            return None
+        return self.devices[index]
+
+    def get_frame(self, index=0):
+        """Return the last frame of the acquisition thread when it runs,
+        a frame from the cache otherwise
+        """
+        device = self.get_device(index)
+        if device is None:
+            return None
+        if self.acquisition is not None:
+            latest = device.ring.latest()
+            if latest is None:
+                return None
+            if monotonic() - latest[0] > 2 * self.acquisition.period:
+                self.stats.incr(STALE)
+            return latest[1]
+        return device.cache.get()
+
+    def get_channel(self, name, index=0):
+        """Return the value of channel name from a decoded frame
+        """
+        frame = self.get_frame(index)
+        if frame is None:
+            return None
+        return frame[name]
+
+    def channel_cb(self, name):
+        """Return a get_data_cb for channel name. The index of the value is the device
+        """
+        def get_data_cb(node_uuid, index):
+            return self.get_channel(name, index)
+        return get_data_cb
+
+    def aggregate_cb(self, name, stat):
+        """Return a get_data_cb for statistic stat of the aggregated channel name
+        """
+        def get_data_cb(node_uuid, index):
+            device = self.get_device(index)
+            if device is None or name not in device.aggregators:
+                return None
+            return device.aggregators[name].get(stat)
+        return get_data_cb
+
+    def feature_cb(self, name):
+        """Return a get_data_cb for the motion feature name
+        """
+        def get_data_cb(node_uuid, index):
+            device = self.get_device(index)
+            if device is None or device.features is None:
+                return None
+            return device.features.get(name)
+        return get_data_cb
+
+    def temperature(self, node_uuid, index):
+        return self.get_channel('temperature', index)
+
+    def counter_cb(self, counter):
+        """Return a get_data_cb for a counter of the I2C statistics
+        """
+        def get_data_cb(node_uuid, index):
+            return self.stats.get(counter)
+        return get_data_cb
+
+    def histogram_cb(self, name, stat):
+        """Return a get_data_cb for a statistic (avg, p99 or max) in ms of a histogram
+        """
+        def get_data_cb(node_uuid, index):
+            histogram = getattr(self.stats, name)
+            if stat == 'avg':
+                value = histogram.mean()
+            elif stat == 'p99':
+                value = histogram.percentile(99)
+            else:
+                value = histogram.max if histogram.count else None
+            return None if value is None else value * 1000.0
+        return get_data_cb
+
+    def stream(self, node_uuid, index):
+        return self.stream_payload
+
+    def event(self, node_uuid, index):
+        return self.event_payload
+
+    def idle_data(self, node_uuid, index):
+        if self.power is None:
+            return None
+        return 1 if self.power.idle else 0
+
+    def motion_data(self, node_uuid, index):
+        if self.int_pin is None:
+            return None
+        return 1 if self.motion.is_set() else 0
+
+    def interrupts_data(self, node_uuid, index):
+        return self._interrupts
+
+    def backfill_data(self, node_uuid, index):
+        return self.backfill_payload
+
+    def events(self, node_uuid, index):
+        return sum(device.trigger.fired for device in self.devices if device.trigger is not None)
+
+    def interval_cb(self, stat):
+        """Return a get_data_cb for a statistic of the intervals between the frames of the main device
+        """
+        def get_data_cb(node_uuid, index):
+            value = getattr(self.devices[0].intervals, stat)
+            if value is None or stat in ('rate', 'missed'):
+                return value
+            return value * 1000.0
+        return get_data_cb
+
+    def cache_hits(self, node_uuid, index):
+        return self.cache.hits
+
+    def cache_misses(self, node_uuid, index):
+        return self.cache.misses
 
     def check_heartbeat(self):
         """Check that the component is 'available'
 
         """
-        return self.sensor is not None
+        self.save_calibration()
+        if self.clock.due():
+            self.clock.sync()
+        self.log_stats()
+        self.recover()
+        return any(device.readable for device in self.devices)
+
+    def log_stats(self):
+        """Dump the I2C statistics in the log every stats_log_interval seconds
+        """
+        interval = self.values["stats_log_interval"].data
+        if not interval or monotonic() - self._stats_logged < interval:
+            return
+        self._stats_logged = monotonic()
+        overruns = self.acquisition.overruns if self.acquisition is not None else 0
+        logger.info("[%s] - %s overruns:%s", self.__class__.__name__, self.stats.summary(), overruns)
+        for device in self.devices:
+            logger.info("[%s] - %s %s", self.__class__.__name__, device, device.intervals.summary())
+        for client in self.clients:
+            wait = client.waits.percentile(99)
+            logger.info("[%s] - %s wait p99:%.3f ms deferred:%s", self.__class__.__name__, client.name,
+                (wait or 0.0) * 1000, client.deferred)
+
+    def next_deadline(self):
+        """Return the time before which the reads of the acquisition cycle should
+        end, when called from the acquisition thread. None otherwise
+        """
+        acquisition = self.acquisition
+        if acquisition is None or threading.current_thread() is not acquisition:
+            return None
+        return acquisition.deadline
 
     def start(self, mqttc):
         """Start the bus
         """
         JNTComponent.start(self, mqttc)
-        self._bus.i2c_acquire()
+        self.mqttc = mqttc
+        self.broker.attach(mqttc)
+        self.cache.max_age = self.values["cache_max_age"].data
+        self._read_retries = self.values["read_retries"].data or 0
+        main = self.devices[0]
+        main.bus = self._bus
+        main.address = self.values["addr"].data
+        main.busnum = self._bus.get_busnum()
+        self.devices = [main]
         try:
-            self.sensor = BNO055.BNO055(rst=self.values["reset_pin"].data, address=self.values["addr"].data, i2c=self._bus.get_adafruit_i2c(), busnum=self._bus.get_busnum())
-        except Exception:
-            logger.exception("[%s] - Can't start component", self.__class__.__name__)
+            for address in parse_devices(self.values["devices"].data):
+                device = BNODevice(len(self.devices), self._bus, address, main.busnum)
+                device.cache = FrameCache(functools.partial(self.read_frame, device.index),
+                    listener=functools.partial(self.poll_frame, device.index))
+                self.devices.append(device)
+        except ValueError:
+            logger.exception("[%s] - Bad devices configuration", self.__class__.__name__)
+        self.clients = []
+        if self.values["bus_priority"].data is not None:
+            from janitoo_raspberry_i2c_bno055.arbiter import get_arbiter
+            #One client : the devices are still read under one lock
+            client = get_arbiter(self._bus).client("%s_%s" % (self.uuid, main.busnum),
+                priority=self.values["bus_priority"].data,
+                budget=self.values["bus_budget"].data,
+                deadline=self.next_deadline)
+            self.clients.append(client)
+            for device in self.devices:
+                device.bus = client
+        self.throttled.interval = self.values["log_interval"].data
+        for device in self.devices:
+            device.recovery = Recovery(self.values["failure_threshold"].data, self.values["backoff_max"].data)
+            device.cache.max_age = self.cache.max_age
+        self.start_windows()
+        self._mode = self.get_mode("operation_mode", chip.OPERATION_MODES, chip.OPERATION_MODE_NDOF)
+        self._power_mode = self.get_mode("power_mode", chip.POWER_MODES, chip.POWER_MODE_NORMAL)
+        self._idle_power_mode = self.get_mode("idle_power_mode", chip.IDLE_POWER_MODES, chip.POWER_MODE_LOWPOWER)
+        self.power = None
+        if self.values["idle_timeout"].data:
+            from janitoo_raspberry_i2c_bno055.power import ActivityPolicy
+            self.power = ActivityPolicy(self.values["idle_timeout"].data, self.values["activity_threshold"].data)
+        self.deadbands = {}
+        self.start_deadbands()
+        self._settings = self.settings_snapshot()
+        self.batcher = None
+        batch_size = self.values["stream_batch_size"].data
+        if batch_size:
+            try:
+                self.batcher = FrameBatcher(
+                    [name.strip() for name in self.values["stream_channels"].data.split(',')],
+                    batch_size, self.values["stream_max_latency"].data,
+                    self.values["stream_format"].data, clock=self.clock)
+            except ValueError:
+                logger.exception("[%s] - Can't configure streaming", self.__class__.__name__)
+            if batch_size > BATCH_MAX_FRAMES:
+                logger.warning("[%s] - stream_batch_size is limited to %s frames", self.__class__.__name__, BATCH_MAX_FRAMES)
+        #The chip needs hundreds of milliseconds to come up : don't block the bus thread
+        self._stopevent.clear()
+        self._starter = threading.Thread(target=self.start_sensor, name="%s_starter" % self.uuid)
+        self._starter.daemon = True
+        self._starter.start()
+
+    def start_sensor(self):
+        """Bring the chips up, restore their calibration and start the acquisition
+        """
+        #The chips are started in parallel : chip.begin() releases the bus during the reset delays
+        starters = [threading.Thread(target=self.start_device, args=(device,),
+                name="%s_starter_%s" % (self.uuid, device.index)) for device in self.devices]
+        for starter in starters:
+            starter.start()
+        for starter in starters:
+            starter.join()
+        if self._stopevent.is_set():
+            return
+        #Even if no chip is up : the acquisition thread re-initializes them
+        self.start_interrupts()
+        rate = self.values["sample_rate"].data
+        if rate:
+            for device in self.devices:
+                device.ring = FrameRing(self.values["ring_size"].data)
+            self.start_features()
+            self.start_triggers()
+            self.start_spool()
+            self.acquisition = AcquisitionThread(self.read_cycle, [device.ring for device in self.devices], rate,
+                listeners=[self.on_frame], name="%s_acquisition" % self.uuid,
+                gate=self.motion if self.int_pin is not None else None)
+            self.acquisition.start()
+        if self.batcher is not None and self.batcher.max_latency > 0:
+            self._streamer = threading.Thread(target=self.run_stream, name="%s_stream" % self.uuid)
+            self._streamer.daemon = True
+            self._streamer.start()
+        if self.values["reload_interval"].data:
+            self._reloader = threading.Thread(target=self.watch_settings, name="%s_reload" % self.uuid)
+            self._reloader.daemon = True
+            self._reloader.start()
+
+    def start_windows(self):
+        """Create the window aggregators of the devices
+        """
+        window = self.values["window_size"].data
+        for device in self.devices:
+            device.aggregators = dict((name, make_aggregator(name, window)) for name, help, extract in AGGREGATES)
+
+    def start_deadbands(self):
+        """Create the deadbands of the values published on change. The last
+        published values are kept
+        """
+        deadbands = {}
+        for uuid in DEADBAND_VALUES:
+            deadband = Deadband(self.values['%s_deadband' % uuid].data,
+                self.values['%s_deadband_rel' % uuid].data,
+                self.values["max_silence"].data)
+            if not deadband.enabled:
+                continue
+            if uuid in self.deadbands:
+                deadband.published(self.deadbands[uuid].last_value, self.deadbands[uuid].last_time)
+            deadbands[uuid] = deadband
+        self.deadbands = deadbands
+
+    def settings_snapshot(self):
+        """Return the values of the settings applied live, by applying method
+        """
+        return dict((method, tuple(self.values[uuid].data for uuid in uuids))
+            for method, uuids in RELOADABLE)
+
+    def watch_settings(self):
+        """Check the settings every reload_interval seconds and apply their changes
+        """
+        interval = self.values["reload_interval"].data
+        while not self._stopevent.wait(interval):
+            try:
+                self.reload_settings()
+            except Exception:
+                logger.exception("[%s] - Exception when reloading the settings", self.__class__.__name__)
+
+    def reload_settings(self):
+        """Apply the settings which changed since the last call, between two
+        acquisition cycles : the frames are never processed with half of them.
+        Return the names of the applying methods called
+        """
+        settings = self.settings_snapshot()
+        changed = [method for method, uuids in RELOADABLE if settings[method] != self._settings.get(method)]
+        if not changed:
+            return changed
+        acquisition = self.acquisition
+        if acquisition is not None:
+            acquisition.lock.acquire()
+        try:
+            for method in changed:
+                getattr(self, method)()
         finally:
-            self._bus.i2c_release()
+            if acquisition is not None:
+                acquisition.lock.release()
+        self._settings = settings
+        logger.info("[%s] - Settings reloaded : %s", self.__class__.__name__, ', '.join(changed))
+        return changed
+
+    def apply_rate(self):
+        """Apply the sample rate to the acquisition thread
+        """
+        rate = self.values["sample_rate"].data
+        if self.acquisition is None or not rate:
+            logger.warning("[%s] - The acquisition thread can't be started or stopped live : restart the component", self.__class__.__name__)
+            return
+        if self.power is not None and self.power.idle:
+            #Applied when going active
+            return
+        self.acquisition.set_rate(rate)
+        for device in self.devices:
+            device.intervals.restart()
+
+    def apply_mode(self):
+        """Apply the operation and power modes to the running chips. They are
+        not reset : their calibration is kept
+        """
+        self._mode = self.get_mode("operation_mode", chip.OPERATION_MODES, chip.OPERATION_MODE_NDOF)
+        self._power_mode = self.get_mode("power_mode", chip.POWER_MODES, chip.POWER_MODE_NORMAL)
+        idle = self.power is not None and self.power.idle
+        for device in self.devices:
+            if not device.readable:
+                continue
+            try:
+                chip.set_operation_mode(device.sensor, device.bus, self._mode,
+                    None if idle else self._power_mode, sleep=self._stopevent.wait)
+            except Exception:
+                self.throttled.exception(('mode', device.index), "[%s] - Exception when changing the mode of %s", self.__class__.__name__, device)
+
+    def get_mode(self, uuid, modes, default):
+        """Return the register value of the mode named by a config value
+        """
+        name = self.values[uuid].data
+        if name not in modes:
+            logger.error("[%s] - Unknown %s %s, use one of %s", self.__class__.__name__, uuid, name, ', '.join(sorted(modes)))
+            return default
+        return modes[name]
+
+    def apply_power(self):
+        """Apply the power mode and the sample rate of the state of the activity policy
+        """
+        idle = self.power.idle
+        logger.info("[%s] - Go %s", self.__class__.__name__, 'idle' if idle else 'active')
+        power_mode = self._idle_power_mode if idle else self._power_mode
+        if self._idle_power_mode != self._power_mode:
+            for device in self.devices:
+                if not device.readable:
+                    continue
+                try:
+                    chip.set_power_mode(device.sensor, device.bus, power_mode, sleep=self._stopevent.wait)
+                except Exception:
+                    self.throttled.exception(('power', device.index), "[%s] - Exception when changing the power mode of %s", self.__class__.__name__, device)
+        rate = self.values["idle_sample_rate"].data if idle else None
+        if self.acquisition is not None:
+            self.acquisition.set_rate(rate or self.values["sample_rate"].data)
+            for device in self.devices:
+                device.intervals.restart()
+        self.publish_value('idle')
+
+    def interrupt_registers(self):
+        """Return the interrupt settings of the main chip or None
+        """
+        if self.values["int_pin"].data is None:
+            return None
+        return chip.interrupt_registers(
+            any_motion=self.values["any_motion_threshold"].data,
+            no_motion=self.values["no_motion_threshold"].data,
+            no_motion_delay=self.values["no_motion_delay"].data,
+            high_g=self.values["high_g_threshold"].data)
+
+    def start_interrupts(self):
+        """Wait for the interrupts of the main chip on int_pin
+        """
+        pin = self.values["int_pin"].data
+        if pin is None:
+            return
+        from janitoo_raspberry_i2c_bno055.gpio import make_interrupt_pin
+        try:
+            self.int_pin = make_interrupt_pin('fake' if self.values["backend"].data == 'sim' else 'adafruit', pin)
+        except Exception:
+            logger.exception("[%s] - Can't set up the interrupt pin %s", self.__class__.__name__, pin)
+            return
+        #Sample until the chip tells there is no motion
+        self.motion.set()
+        self._watcher = threading.Thread(target=self.watch_interrupts, name="%s_interrupts" % self.uuid)
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    def watch_interrupts(self):
+        """Handle the interrupts until stopped
+        """
+        #An interrupt raised before the edge detection keeps the pin high : clear it
+        self.handle_interrupt()
+        while not self._stopevent.is_set():
+            if self.int_pin.wait(1.0) and not self._stopevent.is_set():
+                self.handle_interrupt()
+
+    def handle_interrupt(self):
+        """Read and clear the interrupts of the main chip, then pause or resume the sampling
+        """
+        device = self.devices[0]
+        if not device.readable:
+            return
+        try:
+            status = chip.read_interrupts(device.sensor, device.bus)
+        except Exception:
+            self.throttled.exception(('interrupt', device.index), "[%s] - Exception when reading interrupts of %s", self.__class__.__name__, device)
+            return
+        if not status:
+            return
+        self._interrupts += 1
+        if status & (chip.INT_ACC_AM | chip.INT_ACC_HIGH_G):
+            moving = True
+        elif status & chip.INT_ACC_NM:
+            moving = False
+        else:
+            return
+        if self.power is not None and (self.power.active(monotonic()) if moving else self.power.sleep()):
+            self.apply_power()
+        if self.acquisition is None:
+            #No sampling : refresh the cache for the next polls
+            self.cache.load()
+        #At rest, the polls are served from the cache instead of the bus
+        self.cache.held = not moving
+        if moving != self.motion.is_set():
+            if moving:
+                self.motion.set()
+            else:
+                self.motion.clear()
+                #The pause of the sampling is not a gap
+                for device in self.devices:
+                    device.intervals.restart()
+            self.publish_value('motion')
+
+    def start_features(self):
+        """Create the feature extractors of the devices. On a reload, the
+        new ones continue the counts of the previous ones
+        """
+        previous = [device.features for device in self.devices]
+        for device in self.devices:
+            device.features = None
+        window = min(self.values["feature_window"].data, self.values["ring_size"].data)
+        if not window or self.devices[0].ring is None:
+            return
+        for device in self.devices:
+            try:
+                device.features = FeatureExtractor(window,
+                    step_threshold=self.values["step_threshold"].data,
+                    step_interval=self.values["step_interval"].data,
+                    impact_threshold=self.values["impact_threshold"].data,
+                    band_low=self.values["vibration_low"].data,
+                    band_high=self.values["vibration_high"].data)
+                if previous[device.index] is not None:
+                    device.features.take_over(previous[device.index])
+            except ImportError:
+                logger.warning("[%s] - numpy is not installed : motion features are disabled", self.__class__.__name__)
+                return
+
+    def start_triggers(self):
+        """Create the trigger engines of the devices. On a reload, the
+        new ones continue the counts of the previous ones
+        """
+        previous = [device.trigger for device in self.devices]
+        for device in self.devices:
+            device.trigger = None
+        if not self.values["triggers"].data or self.devices[0].ring is None:
+            return
+        from janitoo_raspberry_i2c_bno055.trigger import TriggerEngine, parse_rules
+        pre = self.values["trigger_pre"].data
+        post = self.values["trigger_post"].data
+        #The frames of an event must still be in the ring when it is built
+        pre = max(0, min(pre, self.values["ring_size"].data - post - 1))
+        channels = [name.strip() for name in self.values["trigger_channels"].data.split(',')]
+        for device in self.devices:
+            try:
+                rules = parse_rules(self.values["triggers"].data)
+                if not rules:
+                    return
+                device.trigger = TriggerEngine(rules, channels, pre=pre, post=post,
+                    holdoff=self.values["trigger_holdoff"].data, device=device.index, clock=self.clock)
+                if previous[device.index] is not None:
+                    device.trigger.take_over(previous[device.index])
+            except ValueError:
+                logger.exception("[%s] - Can't configure triggers", self.__class__.__name__)
+                return
+
+    def start_spool(self):
+        """Open the spool and start its thread
+        """
+        size = self.values["spool_size"].data
+        home_dir = self.get_home_dir()
+        if not size or home_dir is None:
+            return
+        from janitoo_raspberry_i2c_bno055.spool import Spool
+        try:
+            self.spool = Spool(os.path.join(home_dir, '%s_spool' % self.uuid),
+                [name.strip() for name in self.values["spool_channels"].data.split(',')],
+                segment_records=self.values["spool_segment_size"].data,
+                max_bytes=size * 1024 * 1024)
+        except Exception:
+            logger.exception("[%s] - Can't open the spool", self.__class__.__name__)
+            return
+        self._spooler = threading.Thread(target=self.run_spool, name="%s_spool" % self.uuid)
+        self._spooler.daemon = True
+        self._spooler.start()
+
+    def run_spool(self):
+        """Flush the spool and backfill the frames when the broker comes back
+        """
+        interval = self.values["spool_flush_interval"].data
+        flushed = monotonic()
+        offline_since = None
+        while not self._stopevent.wait(1.0):
+            if monotonic() - flushed >= interval:
+                self.spool.flush()
+                flushed = monotonic()
+            connected = self.broker_connected()
+            if not connected and offline_since is None:
+                #The frames of the last stream batch may not have been delivered either
+                offline_since = time.time() - self.values["stream_max_latency"].data - 1.0
+                logger.warning("[%s] - Broker unreachable, frames will be backfilled from the spool", self.__class__.__name__)
+            elif connected and offline_since is not None:
+                offline_since = self.backfill(offline_since)
+
+    def backfill(self, since):
+        """Publish the spooled frames newer than since in batches. Return None when
+        done, or the time of the last frame sent if the broker went away again
+        """
+        until = time.time()
+        channels = self.spool.channels
+        batch_size = max(1, min(self.values["backfill_batch_size"].data, BATCH_MAX_FRAMES))
+        sent = 0
+        while not self._stopevent.is_set():
+            stamps, rows = self.spool.read(since, batch_size)
+            while stamps and stamps[-1] > until:
+                stamps.pop()
+                rows.pop()
+            if not stamps:
+                break
+            self.backfill_payload = encode_batch(channels, stamps, rows, self.values["stream_format"].data)
+            self.publish_value('backfill')
+            if not self.broker_connected():
+                return since
+            since = stamps[-1]
+            sent += len(stamps)
+            #Don't flood the broker
+            self._stopevent.wait(0.05)
+        logger.info("[%s] - %s frames backfilled", self.__class__.__name__, sent)
+        return None
+
+    def start_device(self, device):
+        """Bring a chip up and restore its calibration. Also used to
+        re-initialize a chip which is down.
+        """
+        try:
+            #The constructor does not use the bus but may wait for the reset pin
+            sensor = make_sensor(self.values["backend"].data,
+                rst=self.values["reset_pin"].data if device.index == 0 else None,
+                address=device.address, i2c=self._bus.get_adafruit_i2c(), busnum=device.busnum,
+                trace=self.values["sim_trace"].data or None, latency=self.values["sim_latency"].data)
+            calibration = chip.load_calibration(self.calibration_path(device))
+            interrupts = self.interrupt_registers() if device.index == 0 else None
+            power_mode = self._idle_power_mode if self.power is not None and self.power.idle else self._power_mode
+            if not chip.begin(sensor, device.bus, mode=self._mode, calibration=calibration, interrupts=interrupts,
+                    power_mode=power_mode, sleep=self._stopevent.wait):
+                logger.error("[%s] - BNO055 not found on %s", self.__class__.__name__, device)
+                device.recovery.init_failure()
+                return
+            if calibration is not None:
+                logger.info("[%s] - Calibration of %s restored", self.__class__.__name__, device)
+        except Exception:
+            self.throttled.exception(('init', device.index), "[%s] - Can't start %s", self.__class__.__name__, device)
+            device.recovery.init_failure()
+            return
+        if self._stopevent.is_set():
+            return
+        device.calibration_saved = False
+        device.sensor = sensor
+        device.recovery.initialized()
+
+    def get_home_dir(self):
+        """Return the home directory or None
+        """
+        try:
+            return self.options.data['home_dir']
+        except Exception:
+            return None
+
+    def calibration_path(self, device):
+        """Return the file of the calibration offsets of a device in the home directory or None
+        """
+        home_dir = self.get_home_dir()
+        if home_dir is None:
+            return None
+        if device.index == 0:
+            return os.path.join(home_dir, '%s_bno055.cal' % self.uuid)
+        return os.path.join(home_dir, '%s_%s_bno055.cal' % (self.uuid, device.index))
+
+    def save_calibration(self):
+        """Store the calibration offsets of the devices once the sensors of the
+        operation mode are fully calibrated
+        """
+        for device in self.devices:
+            path = self.calibration_path(device)
+            if not device.readable or device.calibration_saved or path is None:
+                continue
+            device.bus.i2c_acquire()
+            try:
+                if not chip.is_calibrated(device.sensor.get_calibration_status(), self._mode):
+                    continue
+                data = device.sensor.get_calibration()
+            except Exception:
+                self.throttled.exception(('calibration', device.index), "[%s] - Exception when retrieving calibration of %s", self.__class__.__name__, device)
+                continue
+            finally:
+                device.bus.i2c_release()
+            try:
+                chip.save_calibration(path, data)
+                device.calibration_saved = True
+                logger.info("[%s] - Calibration of %s saved to %s", self.__class__.__name__, device, path)
+            except Exception:
+                logger.exception("[%s] - Exception when saving calibration to %s", self.__class__.__name__, path)
 
     def stop(self):
         """
         """
+        self._stopevent.set()
+        if self._starter is not None:
+            self._starter.join()
+            self._starter = None
+        if self._reloader is not None:
+            self._reloader.join()
+            self._reloader = None
+        if self.acquisition is not None:
+            self.acquisition.stop()
+            self.acquisition.join()
+            self.acquisition = None
+        if self._streamer is not None:
+            self._streamer.join()
+            self._streamer = None
+        if self.batcher is not None:
+            #Don't drop the last partial batch
+            self.publish_stream(self.batcher.flush())
+        if self._watcher is not None:
+            self.int_pin.wake()
+            self._watcher.join()
+            self._watcher = None
+        if self.int_pin is not None:
+            self.int_pin.close()
+            self.int_pin = None
+        if self._spooler is not None:
+            self._spooler.join()
+            self._spooler = None
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+        self.broker.detach()
+        for device in self.devices:
+            if device.reinit is not None:
+                device.reinit.join()
+                device.reinit = None
+        self.save_calibration()
         JNTComponent.stop(self)
-        self.sensor = None
+        for device in self.devices:
+            device.sensor = None
+            device.frame = None
+            device.ring = None
+            device.features = None
+            device.trigger = None
+            device.cache.clear()
+            device.aggregators = {}
+        self.deadbands = {}
+        self.batcher = None
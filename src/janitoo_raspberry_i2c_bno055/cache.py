@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""The frame cache
+
+Serve the last frame read from the BNO055 while it is fresh enough, so
+a burst of polls or queries only costs one I2C transaction.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import threading
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+
+class FrameCache(object):
+    """A time bounded cache of the last frame
+
+    The listener is called with each loaded frame once it is stored and the
+    lock is released. While it runs, the reads of its thread return that
+    frame : it can publish values read from the cache. While held, the
+    cached frame is returned whatever its age.
+    """
+
+    def __init__(self, loader, max_age=0.0, listener=None):
+        """
+        :param loader: the callable reading a new frame. Must return None on error
+        :param max_age: the max age of a cached frame in seconds. 0 disables the cache
+        :param listener: the callable called with each loaded frame
+        """
+        self.loader = loader
+        self.max_age = max_age
+        self.listener = listener
+        self.held = False
+        self.hits = 0
+        self.misses = 0
+        self._entry = (None, 0.0)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _fresh(self):
+        frame, stamp = self._entry
+        if frame is not None and (self.held or monotonic() - stamp <= self.max_age):
+            return frame
+        return None
+
+    def get(self):
+        """Return the cached frame or load a new one
+        """
+        frame = self._fresh()
+        if frame is None:
+            frame = getattr(self._local, 'frame', None)
+        if frame is not None:
+            self.hits += 1
+            return frame
+        with self._lock:
+            #Another caller may have loaded a frame while we were waiting
+            frame = self._fresh()
+            if frame is not None:
+                self.hits += 1
+                return frame
+            self.misses += 1
+            frame = self._load()
+        self._notify(frame)
+        return frame
+
+    def load(self):
+        """Load a new frame, even if the cached one is fresh
+        """
+        with self._lock:
+            frame = self._load()
+        self._notify(frame)
+        return frame
+
+    def _load(self):
+        frame = self.loader()
+        if frame is not None:
+            self._entry = (frame, monotonic())
+        return frame
+
+    def _notify(self, frame):
+        if frame is None or self.listener is None:
+            return
+        self._local.frame = frame
+        try:
+            self.listener(frame)
+        finally:
+            self._local.frame = None
+
+    def put(self, frame, stamp=None):
+        """Store a frame read elsewhere
+        """
+        self._entry = (frame, monotonic() if stamp is None else stamp)
+
+    def clear(self):
+        """Drop the cached frame
+        """
+        self._entry = (None, 0.0)
+        self.held = False
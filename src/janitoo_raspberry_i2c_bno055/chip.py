@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""The BNO055 chip management
+
+Bring the chip up without holding the I2C bus during the long reset
+delays, and persist its calibration offsets.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import logging
+logger = logging.getLogger(__name__)
+import os
+import time
+
+BNO055_ID = 0xA0
+
+BNO055_CHIP_ID_ADDR = 0x00
+BNO055_PAGE_ID_ADDR = 0x07
+BNO055_CALIB_STAT_ADDR = 0x35
+BNO055_OPR_MODE_ADDR = 0x3D
+BNO055_PWR_MODE_ADDR = 0x3E
+BNO055_SYS_TRIGGER_ADDR = 0x3F
+BNO055_CALIB_ADDR = 0x55
+BNO055_CALIB_LEN = 22
+BNO055_INT_STA_ADDR = 0x37
+
+#Page 1 : the interrupt settings
+BNO055_INT_MSK_ADDR = 0x0F
+BNO055_INT_EN_ADDR = 0x10
+BNO055_ACC_AM_THRES_ADDR = 0x11
+BNO055_ACC_INT_SETTINGS_ADDR = 0x12
+BNO055_ACC_HG_DURATION_ADDR = 0x13
+BNO055_ACC_HG_THRES_ADDR = 0x14
+BNO055_ACC_NM_THRES_ADDR = 0x15
+BNO055_ACC_NM_SET_ADDR = 0x16
+
+#The bits of INT_MSK, INT_EN and INT_STA
+INT_ACC_NM = 0x80
+INT_ACC_AM = 0x40
+INT_ACC_HIGH_G = 0x20
+
+#The bit of SYS_TRIGGER clearing the interrupts and the INT pin
+SYS_TRIGGER_RST_INT = 0x40
+
+#The accelerometer range is 4g in the fusion modes : the thresholds are
+#multiples of 7.81mg for any/no motion and of 15.63mg for high g
+AM_THRES_LSB = 0.00781
+HG_THRES_LSB = 0.01563
+#High g must last (1 + 15) * 2ms
+HIGH_G_DURATION = 0x0F
+
+POWER_MODE_NORMAL = 0x00
+POWER_MODE_LOWPOWER = 0x01
+POWER_MODE_SUSPEND = 0x02
+OPERATION_MODE_CONFIG = 0x00
+OPERATION_MODE_NDOF = 0x0C
+
+#The operation modes by name. The non fusion modes (up to amg) leave the
+#euler, quaternion, linear acceleration and gravity registers at 0
+OPERATION_MODES = {
+    'acconly': 0x01,
+    'magonly': 0x02,
+    'gyroonly': 0x03,
+    'accmag': 0x04,
+    'accgyro': 0x05,
+    'maggyro': 0x06,
+    'amg': 0x07,
+    'imuplus': 0x08,
+    'compass': 0x09,
+    'm4g': 0x0A,
+    'ndof_fmc_off': 0x0B,
+    'ndof': OPERATION_MODE_NDOF,
+}
+
+#The indexes in the calibration status (sys, gyro, accel, mag) of the sensors
+#used by the operation modes. The others stay at 0, like sys in the non fusion modes
+CALIB_SYS = 0
+CALIB_GYRO = 1
+CALIB_ACCEL = 2
+CALIB_MAG = 3
+CALIBRATED_SENSORS = {
+    0x01: (CALIB_ACCEL,),
+    0x02: (CALIB_MAG,),
+    0x03: (CALIB_GYRO,),
+    0x04: (CALIB_ACCEL, CALIB_MAG),
+    0x05: (CALIB_ACCEL, CALIB_GYRO),
+    0x06: (CALIB_MAG, CALIB_GYRO),
+    0x07: (CALIB_ACCEL, CALIB_MAG, CALIB_GYRO),
+    0x08: (CALIB_SYS, CALIB_ACCEL, CALIB_GYRO),
+    0x09: (CALIB_SYS, CALIB_ACCEL, CALIB_MAG),
+    0x0A: (CALIB_SYS, CALIB_ACCEL, CALIB_MAG),
+    0x0B: (CALIB_SYS, CALIB_ACCEL, CALIB_MAG, CALIB_GYRO),
+    OPERATION_MODE_NDOF: (CALIB_SYS, CALIB_ACCEL, CALIB_MAG, CALIB_GYRO),
+}
+
+#The power modes by name. In low power, the chip only keeps the accelerometer
+#running until it detects a motion. In suspend, nothing is sampled
+POWER_MODES = {
+    'normal': POWER_MODE_NORMAL,
+    'lowpower': POWER_MODE_LOWPOWER,
+    'suspend': POWER_MODE_SUSPEND,
+}
+
+#The power modes of the idle state. The node wakes up on the activity seen in the
+#samples or on the motion interrupt, which the chip doesn't produce in suspend
+IDLE_POWER_MODES = dict((name, mode) for name, mode in POWER_MODES.items() if mode != POWER_MODE_SUSPEND)
+
+#Delays of the datasheet, with some margin like the Adafruit library
+RESET_DELAY = 0.65
+MODE_DELAY = 0.03
+
+def begin(sensor, bus, mode=OPERATION_MODE_NDOF, calibration=None, interrupts=None,
+        power_mode=POWER_MODE_NORMAL, sleep=time.sleep):
+    """Initialize the chip like BNO055.begin() but release the bus during
+    the reset and mode switch delays. Restore the calibration offsets and
+    set the interrupts up before entering the operation mode.
+
+    :param sensor: the BNO055 instance
+    :param bus: the I2CBus
+    :param mode: the operation mode
+    :param calibration: the 22 bytes of calibration data or None
+    :param interrupts: the (page 1 register, value) of interrupt_registers() or None
+    :param power_mode: the power mode
+    :returns: True if the chip answered with the right id
+    """
+    sensor._mode = mode
+    bus.i2c_acquire()
+    try:
+        try:
+            #Throw away command to get the chip and the bus in a good state after a power down
+            sensor._write_byte(BNO055_PAGE_ID_ADDR, 0, ack=False)
+        except IOError:
+            pass
+        sensor._write_byte(BNO055_OPR_MODE_ADDR, OPERATION_MODE_CONFIG)
+    finally:
+        bus.i2c_release()
+    sleep(MODE_DELAY)
+    bus.i2c_acquire()
+    try:
+        sensor._write_byte(BNO055_PAGE_ID_ADDR, 0)
+        bno_id = sensor._read_byte(BNO055_CHIP_ID_ADDR)
+        if bno_id != BNO055_ID:
+            logger.error('Bad chip id 0x%02X', bno_id)
+            return False
+        if sensor._rst is None:
+            sensor._write_byte(BNO055_SYS_TRIGGER_ADDR, 0x20, ack=False)
+    finally:
+        bus.i2c_release()
+    if sensor._rst is not None:
+        sensor._gpio.set_low(sensor._rst)
+        sleep(0.01)
+        sensor._gpio.set_high(sensor._rst)
+    sleep(RESET_DELAY)
+    bus.i2c_acquire()
+    try:
+        sensor._write_byte(BNO055_PWR_MODE_ADDR, power_mode)
+        sensor._write_byte(BNO055_SYS_TRIGGER_ADDR, 0x0)
+        if calibration is not None:
+            sensor._write_bytes(BNO055_CALIB_ADDR, list(calibration))
+        if interrupts:
+            sensor._write_byte(BNO055_PAGE_ID_ADDR, 1)
+            for address, value in interrupts:
+                sensor._write_byte(address, value)
+            sensor._write_byte(BNO055_PAGE_ID_ADDR, 0)
+        sensor._write_byte(BNO055_OPR_MODE_ADDR, mode)
+    finally:
+        bus.i2c_release()
+    sleep(MODE_DELAY)
+    return True
+
+def set_power_mode(sensor, bus, power_mode, sleep=time.sleep):
+    """Change the power mode of a running chip. The power mode can only be
+    written in config mode : the bus is released during the mode switches.
+    """
+    set_operation_mode(sensor, bus, getattr(sensor, '_mode', OPERATION_MODE_NDOF), power_mode, sleep)
+
+def set_operation_mode(sensor, bus, mode, power_mode=None, sleep=time.sleep):
+    """Change the operation mode, and the power mode if not None, of a running
+    chip. The chip goes through config mode but is not reset : the calibration
+    offsets are kept. The bus is released during the mode switches.
+    """
+    sensor._mode = mode
+    bus.i2c_acquire()
+    try:
+        sensor._write_byte(BNO055_OPR_MODE_ADDR, OPERATION_MODE_CONFIG)
+    finally:
+        bus.i2c_release()
+    sleep(MODE_DELAY)
+    bus.i2c_acquire()
+    try:
+        if power_mode is not None:
+            sensor._write_byte(BNO055_PWR_MODE_ADDR, power_mode)
+        sensor._write_byte(BNO055_OPR_MODE_ADDR, mode)
+    finally:
+        bus.i2c_release()
+    sleep(MODE_DELAY)
+
+def _threshold(value, lsb):
+    return max(1, min(255, int(round(value / lsb))))
+
+def interrupt_registers(any_motion=0.0, no_motion=0.0, no_motion_delay=5, high_g=0.0):
+    """Return the (page 1 register, value) enabling the motion interrupts
+    on the INT pin. A null threshold disables an interrupt.
+
+    :param any_motion: the any motion threshold (in g)
+    :param no_motion: the no motion threshold (in g)
+    :param no_motion_delay: the time without motion before the no motion interrupt (1 to 16 seconds)
+    :param high_g: the high g threshold (in g)
+    """
+    enabled = 0
+    registers = []
+    if any_motion:
+        enabled |= INT_ACC_AM
+        registers.append((BNO055_ACC_AM_THRES_ADDR, _threshold(any_motion, AM_THRES_LSB)))
+    if no_motion:
+        enabled |= INT_ACC_NM
+        registers.append((BNO055_ACC_NM_THRES_ADDR, _threshold(no_motion, AM_THRES_LSB)))
+        #Bit 0 selects no motion (vs slow motion), bits 1-6 the delay in seconds - 1
+        delay = max(1, min(16, int(no_motion_delay)))
+        registers.append((BNO055_ACC_NM_SET_ADDR, ((delay - 1) << 1) | 0x01))
+    if high_g:
+        enabled |= INT_ACC_HIGH_G
+        registers.append((BNO055_ACC_HG_THRES_ADDR, _threshold(high_g, HG_THRES_LSB)))
+        registers.append((BNO055_ACC_HG_DURATION_ADDR, HIGH_G_DURATION))
+    if not enabled:
+        return []
+    #All the axis for motion and high g, any motion on 1 sample
+    registers.append((BNO055_ACC_INT_SETTINGS_ADDR, 0xFC))
+    registers.append((BNO055_INT_MSK_ADDR, enabled))
+    registers.append((BNO055_INT_EN_ADDR, enabled))
+    return registers
+
+def read_interrupts(sensor, bus):
+    """Return the interrupt status and clear the interrupts, so the INT pin goes low
+    """
+    bus.i2c_acquire()
+    try:
+        status = sensor._read_byte(BNO055_INT_STA_ADDR)
+        sensor._write_byte(BNO055_SYS_TRIGGER_ADDR, SYS_TRIGGER_RST_INT)
+    finally:
+        bus.i2c_release()
+    return status
+
+def is_calibrated(status, mode=OPERATION_MODE_NDOF):
+    """Return True if the sensors used by mode are fully calibrated in the
+    4-tuple of get_calibration_status()
+    """
+    return status is not None and all(status[index] == 3 for index in CALIBRATED_SENSORS[mode])
+
+def load_calibration(path):
+    """Return the calibration stored in path or None
+    """
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'rb') as fcal:
+            data = bytearray(fcal.read())
+    except IOError:
+        logger.exception('Exception when loading calibration from %s', path)
+        return None
+    if len(data) != BNO055_CALIB_LEN:
+        logger.warning('Bad calibration file %s', path)
+        return None
+    return data
+
+def save_calibration(path, data):
+    """Store the calibration in path, atomically
+    """
+    tmp = '%s.tmp' % path
+    with open(tmp, 'wb') as fcal:
+        fcal.write(bytes(bytearray(data)))
+    os.rename(tmp, path)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""The clocks of the frames
+
+Frames are stamped with the monotonic clock at the middle of their I2C
+read. The stamps are mapped to the wall clock only when they leave the
+process (stream, spool, events), with an offset resynchronized
+periodically, so an NTP step can't break the intervals between frames.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import logging
+logger = logging.getLogger(__name__)
+import math
+import time
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+
+#The interval (in seconds) between two synchronizations of the wall clock offset
+CLOCK_SYNC_INTERVAL = 60.0
+#The number of readings of the clocks of a synchronization
+CLOCK_SYNC_SAMPLES = 5
+
+#The window (in seconds) of the interval statistics
+INTERVAL_WINDOW = 10.0
+
+class WallClock(object):
+    """Map the monotonic stamps to the wall clock
+    """
+
+    def __init__(self, interval=CLOCK_SYNC_INTERVAL, samples=CLOCK_SYNC_SAMPLES):
+        """
+        :param interval: the interval in seconds between two synchronizations
+        :param samples: the number of readings of the clocks of a synchronization
+        """
+        self.interval = interval
+        self.samples = max(1, samples)
+        self.offset = 0.0
+        #The half width (in seconds) of the best reading of the last synchronization
+        self.uncertainty = None
+        #The change of the offset (in seconds) at the last synchronization
+        self.step = 0.0
+        self.synced = None
+        self.sync()
+
+    def sync(self):
+        """Measure the offset between the clocks. The wall clock is read between two
+        readings of the monotonic one : the narrowest of the brackets is kept.
+        Return the change of the offset
+        """
+        best = None
+        for i in range(self.samples):
+            before = monotonic()
+            wall = time.time()
+            after = monotonic()
+            if best is None or after - before < best[0]:
+                best = (after - before, wall - (before + after) / 2.0)
+        width, offset = best
+        if self.synced is not None:
+            self.step = offset - self.offset
+            if abs(self.step) > 0.001:
+                logger.debug("[%s] - Wall clock moved by %.3f ms", self.__class__.__name__, self.step * 1000)
+        self.offset = offset
+        self.uncertainty = width / 2.0
+        self.synced = monotonic()
+        return self.step
+
+    def due(self, now=None):
+        """Return True when the offset must be synchronized again
+        """
+        now = monotonic() if now is None else now
+        return self.interval > 0 and now - self.synced >= self.interval
+
+    def wall(self, stamp):
+        """Return the wall clock time of a monotonic stamp
+        """
+        return stamp + self.offset
+
+class IntervalStats(object):
+    """The achieved sample rate and the jitter of the intervals between frames
+
+    The values are computed over windows of INTERVAL_WINDOW seconds and are
+    the ones of the last complete window. The BNO055 has no sample counter :
+    the missed samples are inferred from the intervals longer than 1.5 period.
+    """
+
+    def __init__(self, window=INTERVAL_WINDOW):
+        """
+        :param window: the duration in seconds of a window
+        """
+        self.window = window
+        self.rate = None
+        self.jitter = None
+        self.max_interval = None
+        self.missed = 0
+        self._last = None
+        self._start = None
+        self._clear()
+
+    def _clear(self):
+        self._count = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._max = 0.0
+
+    def record(self, stamp, period=None):
+        """Add the stamp of a frame
+
+        :param period: the nominal sample period, to count the missed samples
+        """
+        last, self._last = self._last, stamp
+        if last is None:
+            self._start = stamp
+            return
+        interval = stamp - last
+        if interval <= 0:
+            return
+        self._count += 1
+        self._sum += interval
+        self._sumsq += interval * interval
+        if interval > self._max:
+            self._max = interval
+        if period and interval >= 1.5 * period:
+            self.missed += int(round(interval / period)) - 1
+        if stamp - self._start >= self.window:
+            mean = self._sum / self._count
+            self.rate = self._count / (stamp - self._start)
+            self.jitter = math.sqrt(max(0.0, self._sumsq / self._count - mean * mean))
+            self.max_interval = self._max
+            self._clear()
+            self._start = stamp
+
+    def restart(self):
+        """Forget the last stamp, when the sampling was paused or its rate changed
+        """
+        self._last = None
+        self._clear()
+
+    def summary(self):
+        """Return a line for the log
+        """
+        if self.rate is None:
+            return "rate:- jitter:- missed:%s" % self.missed
+        return "rate:%.2f Hz jitter:%.3f ms max interval:%.3f ms missed:%s" % (
+            self.rate, self.jitter * 1000, self.max_interval * 1000, self.missed)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""The BNO055 devices
+
+A component can drive several chips, on several addresses and I2C buses.
+The devices sharing a bus are read together, under one lock acquisition
+per acquisition cycle.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+from janitoo_raspberry_i2c_bno055.recovery import Recovery
+from janitoo_raspberry_i2c_bno055.clock import IntervalStats
+
+def parse_devices(spec):
+    """Parse a comma separated list of addresses, like "0x29,41"
+
+    :returns: a list of addresses
+    """
+    if not spec:
+        return []
+    return [int(item, 0) for item in (item.strip() for item in spec.split(',')) if item]
+
+class BNODevice(object):
+    """A BNO055 chip driven by the component
+    """
+
+    def __init__(self, index, bus, address=None, busnum=None):
+        """
+        :param index: the index of the values of the device
+        :param bus: the object holding the lock of the bus (i2c_acquire/i2c_release)
+        :param address: the I2C address
+        :param busnum: the I2C bus number
+        """
+        self.index = index
+        self.bus = bus
+        self.address = address
+        self.busnum = busnum
+        self.sensor = None
+        self.frame = None
+        self.ring = None
+        self.cache = None
+        self.aggregators = {}
+        self.features = None
+        self.trigger = None
+        self.calibration_saved = False
+        self.recovery = Recovery()
+        self.intervals = IntervalStats()
+        self.reinit = None
+
+    @property
+    def readable(self):
+        """True if the chip is started and not down
+        """
+        return self.sensor is not None and not self.recovery.down
+
+    def __repr__(self):
+        return "<BNODevice %s bus:%s addr:%s>" % (self.index, self.busnum, self.address)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""The motion features
+
+Derive tilt, linear acceleration, steps, impacts and vibration from the
+frames of the ring buffer. The features are computed with NumPy on whole
+windows of frames, once per window, instead of sample per sample in
+Python. NumPy is imported on demand : the features are disabled when it
+is not installed.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+import logging
+logger = logging.getLogger(__name__)
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_INDEX, FRAME_WIDTH
+
+STANDARD_GRAVITY = 9.80665
+
+#The features computed over a window : (name, help, label)
+FEATURES = (
+    ('tilt', 'The mean tilt from the vertical over the window (in degrees)', 'Tilt'),
+    ('linear_rms', 'The RMS of the linear acceleration magnitude over the window (in m/s²)', 'Linear RMS'),
+    ('linear_max', 'The max of the linear acceleration magnitude over the window (in m/s²)', 'Linear max'),
+    ('vibration_energy', 'The mean square of the linear acceleration in the vibration band over the window (in (m/s²)²)', 'Vibration'),
+    ('vibration_freq', 'The dominant frequency in the vibration band over the window (in Hz)', 'Vibration freq'),
+)
+
+#The events counted since the start : (name, help, label)
+COUNTS = (
+    ('steps', 'The number of steps detected', 'Steps'),
+    ('impacts', 'The number of impacts detected', 'Impacts'),
+)
+
+def get_numpy():
+    """Return the numpy module or None if it is not installed
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+class FeatureExtractor(object):
+    """Compute the motion features of a device over non overlapping windows of its ring
+    """
+
+    def __init__(self, window, step_threshold=1.5, step_interval=0.3, impact_threshold=4.0,
+            band_low=5.0, band_high=50.0):
+        """
+        :param window: the number of frames of a window
+        :param step_threshold: the min linear acceleration of a step (in m/s²)
+        :param step_interval: the min delay between two steps (in seconds)
+        :param impact_threshold: the acceleration magnitude of an impact (in g)
+        :param band_low: the low frequency of the vibration band (in Hz)
+        :param band_high: the high frequency of the vibration band (in Hz)
+        :raises ImportError: when numpy is not installed
+        """
+        self.np = get_numpy()
+        if self.np is None:
+            raise ImportError('numpy is needed by the motion features')
+        self.window = max(2, window)
+        self.step_threshold = step_threshold
+        self.step_interval = step_interval
+        self.impact_threshold = impact_threshold * STANDARD_GRAVITY
+        self.band_low = band_low
+        self.band_high = band_high
+        #The features of the last window
+        self.values = {}
+        self.steps = 0
+        self.impacts = 0
+        self._last_step = None
+        self._impact_high = False
+        self._done = 0
+
+    def get(self, name):
+        """Return a feature or a count, None before the first window
+        """
+        if name == 'steps':
+            return self.steps
+        if name == 'impacts':
+            return self.impacts
+        return self.values.get(name)
+
+    def take_over(self, previous):
+        """Continue the counts and the last window of the extractor replaced by this one
+        """
+        self.values = previous.values
+        self.steps = previous.steps
+        self.impacts = previous.impacts
+        self._last_step = previous._last_step
+        self._impact_high = previous._impact_high
+        self._done = previous._done
+
+    def due(self, ring):
+        """True when a new window of frames is available in the ring
+        """
+        return ring.count - self._done >= self.window
+
+    def update(self, ring):
+        """Compute the features of the last window of the ring
+        """
+        self._done = ring.count
+        stamps, data = ring.snapshot(self.window)
+        self.compute(stamps, data)
+
+    def compute(self, stamps, data):
+        """Compute the features of a window
+
+        :param stamps: the stamps of the frames (array of doubles)
+        :param data: the raw rows of the frames, flattened (array('h') of FRAME_WIDTH values per row)
+        """
+        np = self.np
+        t = np.frombuffer(stamps, dtype=np.float64)
+        rows = np.frombuffer(data, dtype=np.int16).reshape(len(t), FRAME_WIDTH)
+        def columns(*names):
+            idx = [CHANNEL_INDEX[name] for name in names]
+            return rows[:, [i for i, scale in idx]] * np.array([scale for i, scale in idx])
+        values = {}
+
+        gravity = columns('gravity_x', 'gravity_y', 'gravity_z')
+        norm = np.sqrt((gravity * gravity).sum(axis=1))
+        valid = norm > 0
+        if valid.any():
+            cos = np.clip(gravity[valid, 2] / norm[valid], -1.0, 1.0)
+            values['tilt'] = float(np.degrees(np.arccos(cos)).mean())
+
+        linear = columns('linear_x', 'linear_y', 'linear_z')
+        magnitude = np.sqrt((linear * linear).sum(axis=1))
+        values['linear_rms'] = float(np.sqrt((magnitude * magnitude).mean()))
+        values['linear_max'] = float(magnitude.max())
+
+        #Steps : local maxima of the linear acceleration above the threshold.
+        #Only the (few) peaks are filtered in Python, for the refractory delay
+        middle = magnitude[1:-1]
+        peaks = np.nonzero((middle > magnitude[:-2]) & (middle >= magnitude[2:]) &
+            (middle > self.step_threshold))[0] + 1
+        for stamp in t[peaks]:
+            if self._last_step is None or stamp - self._last_step >= self.step_interval:
+                self.steps += 1
+                self._last_step = stamp
+
+        #Impacts : rising edges of the acceleration magnitude above the threshold
+        accel = columns('accel_x', 'accel_y', 'accel_z')
+        high = np.sqrt((accel * accel).sum(axis=1)) > self.impact_threshold
+        edges = np.diff(np.concatenate(([self._impact_high], high)).astype(np.int8))
+        self.impacts += int((edges == 1).sum())
+        self._impact_high = bool(high[-1])
+
+        #Vibration : one sided power spectrum of the linear acceleration, Hann windowed,
+        #summed over the 3 axes. The sample rate comes from the stamps
+        period = float(np.median(np.diff(t))) if len(t) > 1 else 0.0
+        if period > 0:
+            size = len(t)
+            taper = np.hanning(size)
+            signal = (linear - linear.mean(axis=0)) * taper[:, None]
+            power = (np.abs(np.fft.rfft(signal, axis=0)) ** 2).sum(axis=1) * 2 / (size * size * (taper * taper).mean())
+            freqs = np.fft.rfftfreq(size, period)
+            band = (freqs >= self.band_low) & (freqs <= self.band_high)
+            if band.any():
+                values['vibration_energy'] = float(power[band].sum())
+                values['vibration_freq'] = float(freqs[band][power[band].argmax()])
+        self.values = values
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""The BNO055 data block
+
+The BNO055 stores all its output registers in one contiguous range,
+from ACCEL_DATA_X_LSB (0x08) to TEMP (0x34). We read it in a single I2C
+transaction and decode every channel from the same buffer, so all the
+values of a frame come from the same sample.
+
+A Frame keeps the raw register values in an array of int16 (46 bytes for
+the 23 channels) and converts a channel to its unit when it is accessed,
+so holding minutes of frames at 100 Hz stays cheap.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import struct
+from array import array
+
+try:
+    from time import monotonic
+except ImportError:                                         # pragma: no cover
+    #Python 2 : fall back to the wall clock
+    from time import time as monotonic
+
+BNO055_DATA_ADDR = 0x08
+BNO055_DATA_LEN = 45
+
+#22 little endian int16 (accel, mag, gyro, euler, quaternion, linear, gravity)
+#followed by the signed temperature byte
+FRAME_STRUCT = struct.Struct('<22hb')
+
+#(name, index in FRAME_STRUCT, scale)
+#Scales are the default units of the chip (see 3.6.4 of the datasheet) :
+#m/s², µT, degrees per second, degrees and °C
+CHANNELS = (
+    ('accel_x', 0, 1.0/100),
+    ('accel_y', 1, 1.0/100),
+    ('accel_z', 2, 1.0/100),
+    ('mag_x', 3, 1.0/16),
+    ('mag_y', 4, 1.0/16),
+    ('mag_z', 5, 1.0/16),
+    ('gyro_x', 6, 1.0/16),
+    ('gyro_y', 7, 1.0/16),
+    ('gyro_z', 8, 1.0/16),
+    ('heading', 9, 1.0/16),
+    ('roll', 10, 1.0/16),
+    ('pitch', 11, 1.0/16),
+    ('quat_w', 12, 1.0/(1<<14)),
+    ('quat_x', 13, 1.0/(1<<14)),
+    ('quat_y', 14, 1.0/(1<<14)),
+    ('quat_z', 15, 1.0/(1<<14)),
+    ('linear_x', 16, 1.0/100),
+    ('linear_y', 17, 1.0/100),
+    ('linear_z', 18, 1.0/100),
+    ('gravity_x', 19, 1.0/100),
+    ('gravity_y', 20, 1.0/100),
+    ('gravity_z', 21, 1.0/100),
+    ('temperature', 22, 1.0),
+)
+
+CHANNEL_NAMES = tuple(chan[0] for chan in CHANNELS)
+
+#The number of raw values of a frame
+FRAME_WIDTH = len(CHANNELS)
+
+#name -> (index, scale)
+CHANNEL_INDEX = dict((name, (idx, scale)) for name, idx, scale in CHANNELS)
+
+class Frame(object):
+    """The raw values of a data block, read like a dict of channels in their units
+    """
+    __slots__ = ('raw', 'stamp')
+
+    def __init__(self, raw, stamp=None):
+        """
+        :param raw: the FRAME_WIDTH raw values, an array('h')
+        :param stamp: the monotonic time of the read
+        """
+        self.raw = raw
+        self.stamp = stamp
+
+    @classmethod
+    def from_dict(cls, values):
+        """Build a frame from a dict of channels in their units. The missing channels are 0
+        """
+        raw = array('h', [0]) * FRAME_WIDTH
+        for name, value in values.items():
+            idx, scale = CHANNEL_INDEX[name]
+            raw[idx] = max(-32768, min(32767, int(round(value / scale))))
+        return cls(raw)
+
+    def __getitem__(self, name):
+        idx, scale = CHANNEL_INDEX[name]
+        return self.raw[idx] * scale
+
+    def get(self, name, default=None):
+        if name not in CHANNEL_INDEX:
+            return default
+        return self[name]
+
+    def __contains__(self, name):
+        return name in CHANNEL_INDEX
+
+    def __iter__(self):
+        return iter(CHANNEL_NAMES)
+
+    def __len__(self):
+        return FRAME_WIDTH
+
+    def keys(self):
+        return list(CHANNEL_NAMES)
+
+    def items(self):
+        return [(name, self[name]) for name in CHANNEL_NAMES]
+
+    def to_dict(self):
+        """Return all the channels in their units
+        """
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Frame):
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __ne__(self, other):
+        ret = self.__eq__(other)
+        return ret if ret is NotImplemented else not ret
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<Frame %s>" % ' '.join('%s:%s' % item for item in self.items())
+
+def decode_frame(data, stamp=None):
+    """Decode the data block of the BNO055
+
+    :param data: the BNO055_DATA_LEN bytes read from BNO055_DATA_ADDR
+    :type data: bytearray or list
+    :param stamp: the monotonic time of the read
+    :rtype: Frame
+    """
+    return Frame(array('h', FRAME_STRUCT.unpack(bytes(bytearray(data)))), stamp)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""The interrupt pin
+
+Wait for the rising edges of the INT line of the BNO055 on a GPIO. The
+GPIO is accessed through a backend : Adafruit_GPIO (RPi.GPIO on a
+Raspberry Pi), imported on demand, or a fake one for the tests and the
+simulated sensor.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+import logging
+logger = logging.getLogger(__name__)
+import threading
+
+GPIO_BACKENDS = ('adafruit', 'fake')
+
+class InterruptPin(object):
+    """An interrupt line. The edges are latched until the next wait()
+    """
+
+    def __init__(self, pin):
+        self.pin = pin
+        #The number of edges seen
+        self.edges = 0
+        self._event = threading.Event()
+
+    def _edge(self, channel=None):
+        self.edges += 1
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """Wait for an edge. Return True if an edge occurred since the last call
+        """
+        edge = self._event.wait(timeout)
+        self._event.clear()
+        return edge
+
+    def wake(self):
+        """Release a waiting thread, without an edge
+        """
+        self._event.set()
+
+    def close(self):
+        """Release the GPIO
+        """
+        pass
+
+class FakeInterruptPin(InterruptPin):
+    """An interrupt line driven by the code
+    """
+
+    def trigger(self):
+        """Simulate a rising edge
+        """
+        self._edge()
+
+class AdafruitInterruptPin(InterruptPin):
+    """An interrupt line on a GPIO of the platform
+    """
+
+    def __init__(self, pin, gpio=None):
+        """
+        :param pin: the GPIO connected to the INT pin of the chip
+        :param gpio: the Adafruit_GPIO instance, the one of the platform if None
+        """
+        InterruptPin.__init__(self, pin)
+        import Adafruit_GPIO as GPIO
+        if gpio is None:
+            gpio = GPIO.get_platform_gpio()
+        self._gpio = gpio
+        #The INT pin of the BNO055 is push pull, active high
+        self._gpio.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+        self._gpio.add_event_detect(pin, GPIO.RISING, callback=self._edge)
+
+    def close(self):
+        try:
+            self._gpio.remove_event_detect(self.pin)
+        except Exception:
+            logger.exception('[%s] - Exception when releasing GPIO %s', self.__class__.__name__, self.pin)
+
+def make_interrupt_pin(backend, pin):
+    """Create the interrupt pin of a backend
+
+    :param backend: one of GPIO_BACKENDS
+    :param pin: the GPIO connected to the INT pin of the chip
+    """
+    if backend == 'fake':
+        return FakeInterruptPin(pin)
+    if backend == 'adafruit':
+        return AdafruitInterruptPin(pin)
+    raise ValueError('Unknown GPIO backend %s' % backend)
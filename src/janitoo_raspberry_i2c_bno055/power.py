@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""The activity policy
+
+Decide when a node is idle from the motion seen in its frames : the chip
+can then go to low power and the acquisition can slow down, freeing the
+bus for the other components.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+from janitoo_raspberry_i2c_bno055.aggregate import accel_magnitude, gyro_magnitude
+from janitoo_raspberry_i2c_bno055.features import STANDARD_GRAVITY
+
+#The angular rate (in degrees/s) of an active node
+GYRO_ACTIVITY = 5.0
+
+class ActivityPolicy(object):
+    """Go idle after idle_timeout seconds without activity, back to active on the first one
+    """
+
+    def __init__(self, idle_timeout, threshold=0.5):
+        """
+        :param idle_timeout: the time without activity (in seconds) before going idle
+        :param threshold: the deviation of the acceleration from the gravity (in m/s²) of an active node
+        """
+        self.idle_timeout = idle_timeout
+        self.threshold = threshold
+        self.idle = False
+        self._last_active = None
+
+    def is_active(self, frame):
+        """True if the frame shows a motion. The linear acceleration is not
+        used : it is not computed in the non fusion modes
+        """
+        return abs(accel_magnitude(frame) - STANDARD_GRAVITY) > self.threshold or \
+            gyro_magnitude(frame) > GYRO_ACTIVITY
+
+    def update(self, frame, stamp):
+        """Check a frame. Return True if the state changed
+        """
+        if self.is_active(frame):
+            return self.active(stamp)
+        if self._last_active is None:
+            self._last_active = stamp
+        if not self.idle and stamp - self._last_active >= self.idle_timeout:
+            self.idle = True
+            return True
+        return False
+
+    def active(self, stamp):
+        """A motion was detected. Return True if the node was idle
+        """
+        self._last_active = stamp
+        if self.idle:
+            self.idle = False
+            return True
+        return False
+
+    def sleep(self):
+        """The chip told there is no motion. Return True if the node was active
+        """
+        if self.idle:
+            return False
+        self.idle = True
+        return True
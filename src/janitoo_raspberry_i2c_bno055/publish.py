@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""The publishing policies
+
+Decide when a value must be pushed to the broker instead of waiting for
+the next poll.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import json
+import struct
+import base64
+import threading
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+from janitoo_raspberry_i2c_bno055.clock import WallClock
+
+STREAM_FORMATS = ('binary', 'json')
+
+#The header of a binary batch : version, number of channels, number of frames
+BATCH_HEADER = struct.Struct('<BBH')
+BATCH_VERSION = 1
+#The max number of frames in a batch, the count of the header is 16 bits
+BATCH_MAX_FRAMES = 0xFFFF
+
+class Deadband(object):
+    """Publish a value only when it moves past a threshold
+
+    The threshold is absolute (in the unit of the value), relative
+    (a fraction of the last published value) or both. A value is also
+    published when nothing was sent for max_silence seconds.
+    """
+
+    def __init__(self, absolute=0.0, relative=0.0, max_silence=0.0):
+        """
+        :param absolute: the absolute threshold. 0 to disable it
+        :param relative: the relative threshold. 0 to disable it
+        :param max_silence: force a publish after this delay in seconds. 0 to disable it
+        """
+        self.absolute = absolute or 0.0
+        self.relative = relative or 0.0
+        self.max_silence = max_silence or 0.0
+        self.last_value = None
+        self.last_time = None
+
+    @property
+    def enabled(self):
+        return self.absolute > 0 or self.relative > 0
+
+    def check(self, value, now):
+        """Return True if value must be published
+        """
+        if value is None:
+            return False
+        if self.last_value is None:
+            return True
+        delta = abs(value - self.last_value)
+        if self.absolute > 0 and delta >= self.absolute:
+            return True
+        if self.relative > 0 and delta > 0 and delta >= self.relative * abs(self.last_value):
+            return True
+        if self.max_silence > 0 and now - self.last_time >= self.max_silence:
+            return True
+        return False
+
+    def published(self, value, now):
+        """Record the value sent to the broker
+        """
+        self.last_value = value
+        self.last_time = now
+
+    def reset(self):
+        """Forget the last published value
+        """
+        self.last_value = None
+        self.last_time = None
+
+class FrameBatcher(object):
+    """Pack frames in batches to publish them in one message
+
+    A batch is flushed when it holds size frames or when its oldest frame
+    is older than max_latency seconds. As frames may stop coming, the owner
+    must also call flush_due() periodically.
+
+    The json format is a columnar object : {"t":[...], "accel_x":[...], ...}.
+    The binary format is BATCH_HEADER followed by one record per frame :
+    the wall clock time as a double and the channels as floats, all little
+    endian. It is base64 encoded so it fits in a Janitoo string value.
+    """
+
+    def __init__(self, channels, size, max_latency=1.0, fmt='binary', clock=None):
+        """
+        :param channels: the names of the channels in the batch
+        :param size: the number of frames in a batch, up to BATCH_MAX_FRAMES
+        :param max_latency: the max age in seconds of a frame before flushing
+        :param fmt: one of STREAM_FORMATS
+        :param clock: the WallClock mapping the stamps of the frames to the wall clock
+        """
+        if fmt not in STREAM_FORMATS:
+            raise ValueError('Unknown stream format %s' % fmt)
+        unknown = [name for name in channels if name not in CHANNEL_NAMES]
+        if unknown:
+            raise ValueError('Unknown channels %s' % ','.join(unknown))
+        self.channels = tuple(channels)
+        self.size = max(1, min(size, BATCH_MAX_FRAMES))
+        self.max_latency = max_latency or 0.0
+        self.fmt = fmt
+        self.record = struct.Struct('<d%sf' % len(self.channels))
+        self.clock = clock if clock is not None else WallClock()
+        self._stamps = []
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._stamps)
+
+    def add(self, stamp, frame):
+        """Add a frame. Return the payload if the batch must be flushed, None otherwise
+        """
+        row = [frame[name] for name in self.channels]
+        with self._lock:
+            self._stamps.append(self.clock.wall(stamp))
+            self._rows.append(row)
+            if len(self._stamps) >= self.size or self.due(stamp):
+                return self._flush()
+        return None
+
+    def flush_due(self, now):
+        """Return the payload if the oldest frame waited more than max_latency, None otherwise
+        """
+        with self._lock:
+            if self.due(now):
+                return self._flush()
+        return None
+
+    def due(self, now):
+        """Return True if the oldest frame waited more than max_latency
+        """
+        return bool(self._stamps) and self.max_latency > 0 and \
+            self.clock.wall(now) - self._stamps[0] >= self.max_latency
+
+    def flush(self):
+        """Return the payload of the pending frames and empty the batch
+        """
+        with self._lock:
+            return self._flush()
+
+    def _flush(self):
+        if not self._stamps:
+            return None
+        stamps, rows = self._stamps, self._rows
+        self._stamps, self._rows = [], []
+        return encode_batch(self.channels, stamps, rows, self.fmt, self.record)
+
+class BrokerLink(object):
+    """Follow the connection to the broker
+
+    The paho client doesn't raise when the broker is away : publish() returns
+    MQTT_ERR_NO_CONN. The client is shared by the components of the bus
+    thread, so its callbacks are left alone : the state comes from its
+    is_connected() when it has one, from the return codes of the publishes
+    otherwise.
+    """
+
+    def __init__(self):
+        self.connected = True
+        self.client = None
+
+    def attach(self, mqttc):
+        """Follow the paho client of mqttc
+        """
+        #The Janitoo MQTTClient wraps the paho client
+        self.client = getattr(mqttc, '_mqttc', mqttc)
+        self.connected = True
+
+    def detach(self):
+        """Stop following the client
+        """
+        self.client = None
+
+    def published(self, result):
+        """Record the result of a publish : a return code, a MQTTMessageInfo or None when unknown
+        """
+        rc = getattr(result, 'rc', result)
+        if isinstance(rc, int) and not isinstance(rc, bool):
+            self.connected = rc == 0
+
+    def failed(self):
+        """Record a publish which raised
+        """
+        self.connected = False
+
+    def is_connected(self):
+        """Return True if the broker is reachable
+        """
+        is_connected = getattr(self.client, 'is_connected', None)
+        if callable(is_connected):
+            try:
+                return bool(is_connected())
+            except Exception:
+                return False
+        return self.connected
+
+def encode_batch(channels, stamps, rows, fmt='binary', record=None):
+    """Return the payload of a batch of frames
+
+    :param channels: the names of the channels of the rows
+    :param stamps: the wall clock times of the frames
+    :param rows: the lists of the values of the channels of the frames
+    :param fmt: one of STREAM_FORMATS
+    """
+    if fmt == 'json':
+        payload = {'t':stamps}
+        for i, name in enumerate(channels):
+            payload[name] = [row[i] for row in rows]
+        return json.dumps(payload, separators=(',', ':'))
+    if record is None:
+        record = struct.Struct('<d%sf' % len(channels))
+    buf = bytearray(BATCH_HEADER.size + record.size * len(stamps))
+    BATCH_HEADER.pack_into(buf, 0, BATCH_VERSION, len(channels), len(stamps))
+    offset = BATCH_HEADER.size
+    for stamp, row in zip(stamps, rows):
+        record.pack_into(buf, offset, stamp, *row)
+        offset += record.size
+    return base64.b64encode(bytes(buf)).decode('ascii')
+
+def decode_batch(payload, channels):
+    """Decode a binary batch to a list of (wall time, dict of channels)
+    """
+    buf = base64.b64decode(payload)
+    version, count, frames = BATCH_HEADER.unpack_from(buf, 0)
+    if version != BATCH_VERSION or count != len(channels):
+        raise ValueError('Bad batch header')
+    record = struct.Struct('<d%sf' % count)
+    ret = []
+    for i in range(frames):
+        values = record.unpack_from(buf, BATCH_HEADER.size + i * record.size)
+        ret.append((values[0], dict(zip(channels, values[1:]))))
+    return ret
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""The error recovery
+
+Track the consecutive failures of a chip. After some of them the chip is
+considered down : it is not read anymore and is re-initialized in the
+background with an exponential backoff, so a dead device does not use
+the bus. Tracebacks are rate limited so a flapping sensor can't fill the
+log.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+
+STATE_OK = 'ok'
+STATE_FAILING = 'failing'
+STATE_DOWN = 'down'
+
+#The first delay before re-initializing a chip, in seconds
+BACKOFF_BASE = 1.0
+
+class Recovery(object):
+    """The recovery state machine of a chip
+
+    ok -> failing on a failure, failing -> down after threshold consecutive
+    failures, down -> ok when a re-initialization succeeds. Each failed
+    re-initialization doubles the delay before the next one, up to backoff_max.
+    """
+
+    def __init__(self, threshold=3, backoff_max=300.0):
+        self.threshold = max(1, threshold)
+        self.backoff_max = backoff_max
+        self.state = STATE_OK
+        self.failures = 0
+        self.attempts = 0
+        self.next_attempt = 0.0
+
+    @property
+    def down(self):
+        return self.state == STATE_DOWN
+
+    def success(self):
+        """A read succeeded : the backoff is reset
+        """
+        self.state = STATE_OK
+        self.failures = 0
+        self.attempts = 0
+
+    def initialized(self):
+        """A (re-)initialization succeeded. The backoff is kept until
+        a read succeeds, so a chip which can't be read is not restarted in a loop
+        """
+        self.state = STATE_OK
+        self.failures = 0
+
+    def failure(self, now=None):
+        """A read failed. Return True if the chip just went down
+        """
+        self.failures += 1
+        if self.state != STATE_DOWN and self.failures >= self.threshold:
+            self._schedule(monotonic() if now is None else now)
+            return True
+        if self.state == STATE_OK:
+            self.state = STATE_FAILING
+        return False
+
+    def init_failure(self, now=None):
+        """A (re-)initialization failed : the chip is down, schedule the next attempt
+        """
+        self._schedule(monotonic() if now is None else now)
+
+    def _schedule(self, now):
+        self.state = STATE_DOWN
+        self.next_attempt = now + min(self.backoff_max, BACKOFF_BASE * (2 ** self.attempts))
+        self.attempts += 1
+
+    def due(self, now=None):
+        """Return True if the chip is down and must be re-initialized
+        """
+        return self.state == STATE_DOWN and (monotonic() if now is None else now) >= self.next_attempt
+
+class ThrottledLog(object):
+    """Log a traceback at most once per interval and key, count the others
+    """
+
+    def __init__(self, logger, interval=60.0):
+        self.logger = logger
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+
+    def exception(self, key, msg, *args):
+        """Like logger.exception, must be called from an exception handler
+        """
+        now = monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        suppressed = self._suppressed.pop(key, 0)
+        self._last[key] = now
+        if suppressed:
+            msg = "%s (%s similar errors suppressed)" % (msg, suppressed)
+        self.logger.exception(msg, *args)
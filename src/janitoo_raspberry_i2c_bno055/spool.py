@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""The frame spool
+
+An append only store of the sampled frames in home_dir, used to backfill
+the frames sent while the broker was unreachable.
+
+The frames are fixed size records (the wall clock time as a double and
+the channels as floats, like the records of the binary stream batches)
+in preallocated segment files mapped in memory. Appending a frame only
+writes to the mapping : the kernel writes the dirty pages back, and the
+spool flushes them every few seconds, so the SD card sees a few page
+writes instead of one write per frame. When a segment is full, the next
+one is created and the oldest segments are removed to stay under the
+size cap.
+
+An empty record has a null time : there is no write count to update in
+the header and the end of a segment is found again after a restart.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+import logging
+logger = logging.getLogger(__name__)
+import os
+import re
+import mmap
+import struct
+import threading
+import zlib
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+
+#magic, version, number of channels, capacity in records, crc32 of the channel names
+SEGMENT_HEADER = struct.Struct('<4sBBxxII')
+SEGMENT_MAGIC = b'BNOS'
+SEGMENT_VERSION = 1
+SEGMENT_RE = re.compile(r'^(\d{8})\.spool$')
+
+class Spool(object):
+    """A rotating spool of frames in memory mapped segment files
+    """
+
+    def __init__(self, directory, channels, segment_records=65536, max_bytes=64 * 1024 * 1024):
+        """
+        :param directory: the directory of the segment files, created if needed
+        :param channels: the names of the channels of the records
+        :param segment_records: the number of records of a segment
+        :param max_bytes: the max size of the segments on disk
+        """
+        unknown = [name for name in channels if name not in CHANNEL_NAMES]
+        if unknown:
+            raise ValueError('Unknown channels %s' % ','.join(unknown))
+        self.directory = directory
+        self.channels = tuple(channels)
+        self.record = struct.Struct('<d%sf' % len(self.channels))
+        self.capacity = max(1, segment_records)
+        self.segment_size = SEGMENT_HEADER.size + self.record.size * self.capacity
+        self.max_bytes = max_bytes
+        self.signature = zlib.crc32(','.join(self.channels).encode('ascii')) & 0xffffffff
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._count = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        #The sequence numbers of the segments, the oldest first. The last one is the current segment
+        self.segments = self._scan()
+        if self.segments:
+            self._open(self.segments[-1], create=False)
+        else:
+            self.segments.append(0)
+            self._open(0, create=True)
+
+    def path(self, seq):
+        return os.path.join(self.directory, '%08d.spool' % seq)
+
+    def _scan(self):
+        """Return the valid segments found in the directory and remove the others
+        """
+        segments = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_RE.match(name)
+            if match is None:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as segment:
+                    header = segment.read(SEGMENT_HEADER.size)
+                valid = len(header) == SEGMENT_HEADER.size and os.path.getsize(path) == self.segment_size and \
+                    SEGMENT_HEADER.unpack(header) == (SEGMENT_MAGIC, SEGMENT_VERSION, len(self.channels),
+                        self.capacity, self.signature)
+            except (IOError, OSError):
+                valid = False
+            if valid:
+                segments.append(int(match.group(1)))
+            else:
+                logger.warning('[%s] - Remove incompatible segment %s', self.__class__.__name__, path)
+                self._remove(path)
+        return sorted(segments)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            logger.exception("[%s] - Can't remove segment %s", self.__class__.__name__, path)
+
+    def _open(self, seq, create):
+        """Map a segment as the current one
+        """
+        path = self.path(seq)
+        self._file = open(path, 'w+b' if create else 'r+b')
+        if create:
+            self._file.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(self.channels),
+                self.capacity, self.signature))
+            #Sparse : the blocks are allocated when the records are written
+            self._file.truncate(self.segment_size)
+            self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), self.segment_size)
+        self._count = 0 if create else self._records(self._map)
+
+    def _stamp(self, buf, index):
+        return struct.unpack_from('<d', buf, SEGMENT_HEADER.size + index * self.record.size)[0]
+
+    def _records(self, buf):
+        """Return the number of records of a segment : the records are
+        written in order, so the first empty one is found by bisection
+        """
+        low, high = 0, self.capacity
+        while low < high:
+            middle = (low + high) // 2
+            if self._stamp(buf, middle) != 0:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        """Seal the current segment, create the next one and enforce the size cap
+        """
+        self._close()
+        seq = self.segments[-1] + 1
+        self.segments.append(seq)
+        self._open(seq, create=True)
+        while len(self.segments) > 1 and len(self.segments) * self.segment_size > self.max_bytes:
+            self._remove(self.path(self.segments.pop(0)))
+
+    def __len__(self):
+        return (len(self.segments) - 1) * self.capacity + self._count
+
+    def append(self, stamp, frame):
+        """Add a frame
+
+        :param stamp: the wall clock time of the frame
+        :param frame: the dict of the channels
+        """
+        with self._lock:
+            if self._map is None:
+                return
+            if self._count >= self.capacity:
+                self._rotate()
+            self.record.pack_into(self._map, SEGMENT_HEADER.size + self._count * self.record.size,
+                stamp, *[frame[name] for name in self.channels])
+            self._count += 1
+
+    def flush(self):
+        """Write the dirty pages of the current segment to the disk
+        """
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def read(self, since, limit):
+        """Return the first limit records newer than since, as (stamps, rows)
+        """
+        stamps, rows = [], []
+        with self._lock:
+            if self._map is None:
+                return stamps, rows
+            for seq in list(self.segments):
+                if seq == self.segments[-1]:
+                    self._read_segment(self._map, self._count, since, limit, stamps, rows)
+                else:
+                    with open(self.path(seq), 'rb') as segment:
+                        buf = mmap.mmap(segment.fileno(), self.segment_size, access=mmap.ACCESS_READ)
+                        try:
+                            self._read_segment(buf, self.capacity, since, limit, stamps, rows)
+                        finally:
+                            buf.close()
+                if len(stamps) >= limit:
+                    break
+        return stamps, rows
+
+    def _read_segment(self, buf, count, since, limit, stamps, rows):
+        if count == 0 or self._stamp(buf, count - 1) <= since:
+            return
+        low, high = 0, count - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._stamp(buf, middle) <= since:
+                low = middle + 1
+            else:
+                high = middle
+        for index in range(low, min(count, low + limit - len(stamps))):
+            values = self.record.unpack_from(buf, SEGMENT_HEADER.size + index * self.record.size)
+            stamps.append(values[0])
+            rows.append(values[1:])
+
+    def close(self):
+        """Flush and unmap the current segment
+        """
+        with self._lock:
+            self._close()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""The instrumentation of the I2C transactions
+
+Counters and histograms are preallocated arrays : recording a sample
+does not allocate containers, so they can stay enabled on small boards.
+They are doubles, which count exactly up to 2**53 and don't overflow
+like 32 bits unsigned longs would on a Raspberry Pi.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+from array import array
+
+#Bucket i holds the durations d (in µs) with 2**(i-1) <= d < 2**i. The last one is open
+HISTOGRAM_BUCKETS = 24
+
+class Histogram(object):
+    """A log2 histogram of durations
+    """
+
+    def __init__(self):
+        self.buckets = array('d', [0]) * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Add a duration in seconds
+        """
+        bucket = int(seconds * 1000000).bit_length()
+        if bucket >= HISTOGRAM_BUCKETS:
+            bucket = HISTOGRAM_BUCKETS - 1
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def mean(self):
+        """Return the mean duration in seconds or None
+        """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def percentile(self, pct):
+        """Return the upper bound in seconds of the bucket holding the percentile pct, or None
+        """
+        if self.count == 0:
+            return None
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                if bucket == HISTOGRAM_BUCKETS - 1:
+                    return self.max
+                return min((1 << bucket) / 1000000.0, self.max)
+        return self.max
+
+    def reset(self):
+        for i in range(HISTOGRAM_BUCKETS):
+            self.buckets[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+#Indexes of the counters
+READS = 0
+ERRORS = 1
+RETRIES = 2
+BYTES = 3
+STALE = 4
+COUNTERS = ('reads', 'errors', 'retries', 'bytes', 'stale')
+
+class I2CStats(object):
+    """The counters and histograms of the I2C transactions of a component
+    """
+
+    def __init__(self):
+        self.counters = array('d', [0]) * len(COUNTERS)
+        self.lock_wait = Histogram()
+        self.transaction = Histogram()
+
+    def wait(self, wait):
+        """Record the wait for the bus lock
+        """
+        self.lock_wait.record(wait)
+
+    def transfer(self, duration, length):
+        """Record a successful transaction
+        """
+        self.transaction.record(duration)
+        self.counters[READS] += 1
+        self.counters[BYTES] += length
+
+    def incr(self, counter):
+        """Increment one of the counters
+        """
+        self.counters[counter] += 1
+
+    def get(self, counter):
+        return int(self.counters[counter])
+
+    def summary(self):
+        """Return a line for the log
+        """
+        to_ms = lambda value: 0.0 if value is None else value * 1000.0
+        return "reads:%s errors:%s retries:%s bytes:%s stale:%s " \
+            "lock wait avg/p99/max:%.3f/%.3f/%.3f ms i2c avg/p99/max:%.3f/%.3f/%.3f ms" % (
+            tuple(int(count) for count in self.counters) + (
+            to_ms(self.lock_wait.mean()), to_ms(self.lock_wait.percentile(99)), to_ms(self.lock_wait.max),
+            to_ms(self.transaction.mean()), to_ms(self.transaction.percentile(99)), to_ms(self.transaction.max)))
+
+    def reset(self):
+        for i in range(len(COUNTERS)):
+            self.counters[i] = 0
+        self.lock_wait.reset()
+        self.transaction.reset()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""The event triggers
+
+Check trigger rules on every frame of the acquisition. When a rule fires,
+the frames before and after the trigger are taken from the ring buffer
+and packed in one event, so short impacts are caught without streaming.
+
+A rule is <channel><op><threshold>, with op one of :
+
+ - '>' : the channel goes above the threshold
+ - '<' : the channel goes below the threshold
+ - '^' : the channel changes by at least the threshold from one frame to the next
+
+The threshold of the accelerations can be given in g with a 'g' suffix.
+Rules are edge triggered : a rule must go back to false before it can fire again.
+
+"""
+
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+
+import re
+import json
+import math
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+from janitoo_raspberry_i2c_bno055.clock import WallClock
+from janitoo_raspberry_i2c_bno055.aggregate import accel_magnitude, gyro_magnitude
+from janitoo_raspberry_i2c_bno055.features import STANDARD_GRAVITY
+
+def linear_magnitude(frame):
+    """The magnitude of the linear acceleration vector
+    """
+    return math.sqrt(frame['linear_x'] ** 2 + frame['linear_y'] ** 2 + frame['linear_z'] ** 2)
+
+#The channels computed from a frame which can be used in rules
+DERIVED = {
+    'accel_magnitude': accel_magnitude,
+    'gyro_magnitude': gyro_magnitude,
+    'linear_magnitude': linear_magnitude,
+}
+
+OPERATORS = ('>', '<', '^')
+
+RULE_RE = re.compile(r'^\s*(\w+)\s*([<>^])\s*([-+0-9.eE]+)\s*(g?)\s*$')
+
+class TriggerRule(object):
+    """A trigger rule on a channel
+    """
+
+    def __init__(self, spec):
+        """
+        :param spec: the rule, like accel_magnitude>2g
+        :raises ValueError: when the rule can't be parsed
+        """
+        match = RULE_RE.match(spec)
+        if match is None:
+            raise ValueError('Bad trigger rule %s' % spec)
+        self.channel, self.op, threshold, unit = match.groups()
+        if self.channel not in CHANNEL_NAMES and self.channel not in DERIVED:
+            raise ValueError('Unknown channel %s in trigger rule %s' % (self.channel, spec))
+        self.threshold = float(threshold) * (STANDARD_GRAVITY if unit else 1.0)
+        self.name = spec.strip()
+        self._extract = DERIVED.get(self.channel)
+        self._previous = None
+        self._active = False
+
+    def value(self, frame):
+        """The value of the channel of the rule in a frame
+        """
+        if self._extract is not None:
+            return self._extract(frame)
+        return frame[self.channel]
+
+    def check(self, frame):
+        """Return the value of the channel if the rule fires on this frame, None otherwise
+        """
+        value = self.value(frame)
+        if self.op == '>':
+            active = value > self.threshold
+        elif self.op == '<':
+            active = value < self.threshold
+        else:
+            active = self._previous is not None and abs(value - self._previous) >= self.threshold
+            self._previous = value
+        fired = active and not self._active
+        self._active = active
+        return value if fired else None
+
+    def reset(self):
+        self._previous = None
+        self._active = False
+
+def parse_rules(spec):
+    """Parse comma separated rules to a list of TriggerRule
+
+    :raises ValueError: when a rule can't be parsed
+    """
+    if not spec:
+        return []
+    return [TriggerRule(rule) for rule in spec.split(',') if rule.strip()]
+
+class TriggerEngine(object):
+    """Check the rules on every frame and build the events with the frames of the ring
+    """
+
+    def __init__(self, rules, channels, pre=50, post=50, holdoff=1.0, device=0, clock=None):
+        """
+        :param rules: the TriggerRules
+        :param channels: the names of the channels in the events
+        :param pre: the number of frames before the trigger in an event
+        :param post: the number of frames after the trigger in an event
+        :param holdoff: the min delay (in seconds) between the end of an event and the next trigger
+        :param device: the index of the device, written in the events
+        :param clock: the WallClock mapping the stamps of the frames to the wall clock
+        """
+        unknown = [name for name in channels if name not in CHANNEL_NAMES]
+        if unknown:
+            raise ValueError('Unknown channels %s' % ','.join(unknown))
+        self.rules = rules
+        self.channels = tuple(channels)
+        self.pre = max(0, pre)
+        self.post = max(0, post)
+        self.holdoff = holdoff or 0.0
+        self.device = device
+        self.fired = 0
+        self.missed = 0
+        self.clock = clock if clock is not None else WallClock()
+        self._pending = None
+        self._remaining = 0
+        self._ready = 0.0
+
+    def process(self, stamp, frame, ring):
+        """Check a frame which was just pushed to ring. Return the event
+        payload when the capture of an event is complete, None otherwise
+        """
+        rules = self.rules
+        fired = None
+        for rule in rules:
+            value = rule.check(frame)
+            if value is not None and fired is None:
+                fired = (rule, value)
+        if self._pending is not None:
+            if fired is not None:
+                self.missed += 1
+            self._remaining -= 1
+            if self._remaining <= 0:
+                return self.build(ring)
+            return None
+        if fired is None:
+            return None
+        if stamp < self._ready:
+            self.missed += 1
+            return None
+        self.fired += 1
+        self._pending = (stamp, fired[0], fired[1])
+        self._remaining = self.post
+        if self._remaining <= 0:
+            return self.build(ring)
+        return None
+
+    def build(self, ring):
+        """Return the payload of the pending event
+        """
+        stamp, rule, value = self._pending
+        self._pending = None
+        frames = ring.window(self.pre + self.post + 1)
+        self._ready = frames[-1][0] + self.holdoff if frames else stamp
+        event = {
+            'rule': rule.name,
+            'device': self.device,
+            'value': value,
+            'stamp': self.clock.wall(stamp),
+            't': [self.clock.wall(frame_stamp) for frame_stamp, row in frames],
+        }
+        for name in self.channels:
+            event[name] = [row[name] for frame_stamp, row in frames]
+        return json.dumps(event, separators=(',', ':'))
+
+    def take_over(self, previous):
+        """Continue the counts, the holdoff and the pending event of the engine replaced by this one
+        """
+        self.fired = previous.fired
+        self.missed = previous.missed
+        self._pending = previous._pending
+        self._remaining = previous._remaining
+        self._ready = previous._ready
+
+    def reset(self):
+        """Drop the pending event and rearm the rules
+        """
+        self._pending = None
+        self._ready = 0.0
+        for rule in self.rules:
+            rule.reset()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the acquisition thread.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import time
+import threading
+import unittest
+import logging
+
+from janitoo_raspberry_i2c_bno055.acquisition import FrameRing, AcquisitionThread
+from janitoo_raspberry_i2c_bno055.frame import FRAME_WIDTH, decode_frame
+
+class TestFrameRing(unittest.TestCase):
+    """Test the ring buffer
+    """
+
+    def test_001_empty(self):
+        ring = FrameRing(4)
+        self.assertEqual(len(ring), 0)
+        self.assertEqual(ring.latest(), None)
+        self.assertEqual(ring.window(), [])
+
+    def test_002_wrap(self):
+        ring = FrameRing(4)
+        for i in range(10):
+            ring.push({'heading':float(i), 'roll':-float(i)}, float(i))
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.count, 10)
+        stamp, frame = ring.latest()
+        self.assertEqual(stamp, 9.0)
+        self.assertEqual((frame['heading'], frame['roll'], frame['pitch']), (9.0, -9.0, 0.0))
+        self.assertEqual(ring.column('heading'), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(ring.column('roll', 2), [-8.0, -9.0])
+        self.assertEqual([stamp for stamp, frame in ring.window(3)], [7.0, 8.0, 9.0])
+        ring.clear()
+        self.assertEqual(ring.latest(), None)
+
+    def test_003_snapshot(self):
+        ring = FrameRing(4)
+        stamps, data = ring.snapshot()
+        self.assertEqual(list(stamps), [])
+        for i in range(6):
+            ring.push({'accel_x': i, 'temperature': -i}, stamp=float(i))
+        stamps, data = ring.snapshot()
+        self.assertEqual(list(stamps), [2.0, 3.0, 4.0, 5.0])
+        #The raw values : accel_x is in 1/100 m/s², temperature in °C
+        self.assertEqual(data.typecode, 'h')
+        self.assertEqual(len(data), 4 * FRAME_WIDTH)
+        self.assertEqual(list(data[::FRAME_WIDTH]), [200, 300, 400, 500])
+        self.assertEqual(list(data[FRAME_WIDTH - 1::FRAME_WIDTH]), [-2, -3, -4, -5])
+        stamps, data = ring.snapshot(2)
+        self.assertEqual(list(stamps), [4.0, 5.0])
+        self.assertEqual(list(data[::FRAME_WIDTH]), [400, 500])
+
+    def test_004_frames(self):
+        ring = FrameRing(4)
+        frame = decode_frame(bytearray(range(45)))
+        ring.push(frame, 1.0)
+        stamp, stored = ring.latest()
+        self.assertEqual(stored, frame)
+        self.assertFalse(stored is frame)
+        self.assertEqual(stored.to_dict(), frame.to_dict())
+
+class TestAcquisitionThread(unittest.TestCase):
+    """Test the acquisition thread
+    """
+
+    def test_001_sample(self):
+        frames = []
+        ring = FrameRing(16)
+        def reader():
+            return [{'temperature':1.0}]
+        thread = AcquisitionThread(reader, [ring], 200, listeners=[lambda stamp, frame, index: frames.append(stamp)])
+        thread.start()
+        time.sleep(0.2)
+        thread.stop()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(ring.count > 5)
+        self.assertEqual(len(frames), ring.count)
+        self.assertEqual(ring.latest()[1]['temperature'], 1.0)
+
+    def test_002_read_error(self):
+        ring = FrameRing(16)
+        thread = AcquisitionThread(lambda: [None], [ring], 200)
+        thread.start()
+        time.sleep(0.05)
+        thread.stop()
+        thread.join(1)
+        self.assertEqual(ring.count, 0)
+
+    def test_003_aligned(self):
+        rings = [FrameRing(16), FrameRing(16)]
+        thread = AcquisitionThread(lambda: [{'temperature':1.0}, {'temperature':2.0}], rings, 200)
+        thread.start()
+        time.sleep(0.05)
+        thread.stop()
+        thread.join(1)
+        self.assertEqual(rings[0].latest()[0], rings[1].latest()[0])
+        self.assertEqual(rings[1].latest()[1]['temperature'], 2.0)
+
+    def test_004_gate(self):
+        ring = FrameRing(1000)
+        gate = threading.Event()
+        thread = AcquisitionThread(lambda: [{'temperature':1.0}], [ring], 200, gate=gate)
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(ring.count, 0)
+        gate.set()
+        time.sleep(0.1)
+        gate.clear()
+        time.sleep(0.02)
+        count = ring.count
+        self.assertTrue(count > 5)
+        time.sleep(0.1)
+        self.assertEqual(ring.count, count)
+        thread.stop()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+
+    def test_005_read_stamp(self):
+        ring = FrameRing(16)
+        def reader():
+            return [decode_frame(bytearray(45), stamp=42.0), {'temperature':1.0}]
+        rings = [ring, FrameRing(16)]
+        thread = AcquisitionThread(reader, rings, 200)
+        thread.start()
+        time.sleep(0.05)
+        thread.stop()
+        thread.join(1)
+        self.assertEqual(ring.latest()[0], 42.0)
+        self.assertEqual(ring.latest()[1].stamp, 42.0)
+        self.assertNotEqual(rings[1].latest()[0], 42.0)
+
+    def test_006_lock(self):
+        ring = FrameRing(1000)
+        thread = AcquisitionThread(lambda: [{'temperature':1.0}], [ring], 200)
+        thread.start()
+        time.sleep(0.05)
+        with thread.lock:
+            #No cycle runs while the settings are changed
+            count = ring.count
+            time.sleep(0.05)
+            self.assertEqual(ring.count, count)
+        time.sleep(0.05)
+        self.assertTrue(ring.count > count)
+        thread.stop()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+
+    def test_007_reader_exception(self):
+        ring = FrameRing(1000)
+        calls = []
+        def reader():
+            calls.append(1)
+            if len(calls) <= 3:
+                raise IOError('short read')
+            return [{'temperature':1.0}]
+        thread = AcquisitionThread(reader, [ring], 200)
+        logging.disable(logging.CRITICAL)
+        try:
+            thread.start()
+            time.sleep(0.1)
+        finally:
+            logging.disable(logging.NOTSET)
+        #The thread goes on with the next cycles
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(thread.errors, 3)
+        self.assertTrue(ring.count > 0)
+        thread.stop()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
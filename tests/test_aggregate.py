@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the windowed aggregators.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import math
+import random
+import unittest
+
+from janitoo_raspberry_i2c_bno055.aggregate import WindowAggregator, AngleAggregator, make_aggregator, accel_magnitude
+
+class TestWindowAggregator(unittest.TestCase):
+    """Test the incremental statistics against a rescan of the window
+    """
+
+    def test_001_empty(self):
+        agg = WindowAggregator(10)
+        self.assertEqual(agg.stats(), None)
+        self.assertEqual(agg.get('mean'), None)
+
+    def test_002_against_rescan(self):
+        rand = random.Random(42)
+        agg = WindowAggregator(17)
+        values = []
+        for i in range(500):
+            value = rand.uniform(-100, 100)
+            values.append(value)
+            agg.push(value)
+            window = values[-17:]
+            stats = agg.stats()
+            self.assertAlmostEqual(stats['mean'], sum(window) / len(window))
+            self.assertEqual(stats['min'], min(window))
+            self.assertEqual(stats['max'], max(window))
+            self.assertEqual(stats['p2p'], max(window) - min(window))
+            self.assertAlmostEqual(stats['rms'], math.sqrt(sum(v * v for v in window) / len(window)))
+        self.assertEqual(len(agg), 17)
+
+    def test_003_clear(self):
+        agg = WindowAggregator(3)
+        agg.push(1.0)
+        agg.clear()
+        agg.push(5.0)
+        self.assertEqual(agg.stats()['min'], 5.0)
+
+    def test_004_magnitude(self):
+        self.assertAlmostEqual(accel_magnitude({'accel_x':3.0, 'accel_y':4.0, 'accel_z':12.0}), 13.0)
+
+class TestAngleAggregator(unittest.TestCase):
+    """Test the statistics of the heading
+    """
+
+    def test_001_around_north(self):
+        agg = AngleAggregator(4)
+        self.assertEqual(agg.stats(), None)
+        for value in (359.0, 1.0, 358.0, 2.0):
+            agg.push(value)
+        stats = agg.stats()
+        self.assertAlmostEqual(min(stats['mean'], 360.0 - stats['mean']), 0.0)
+        self.assertAlmostEqual(stats['p2p'], 4.0)
+        self.assertAlmostEqual(stats['min'], 358.0)
+        self.assertAlmostEqual(stats['max'], 2.0)
+        self.assertAlmostEqual(stats['rms'], math.sqrt(2.5))
+
+    def test_002_window(self):
+        agg = AngleAggregator(3)
+        #A slow turn : only the last 3 samples are kept
+        for value in range(350, 370, 2):
+            agg.push(float(value % 360))
+        self.assertEqual(len(agg), 3)
+        self.assertAlmostEqual(agg.get('mean'), 6.0)
+        self.assertAlmostEqual(agg.get('p2p'), 4.0)
+        agg.clear()
+        agg.push(180.0)
+        self.assertEqual(agg.get('p2p'), 0.0)
+        self.assertAlmostEqual(agg.get('mean'), 180.0)
+
+    def test_003_factory(self):
+        self.assertTrue(isinstance(make_aggregator('heading', 10), AngleAggregator))
+        self.assertTrue(isinstance(make_aggregator('temperature', 10), WindowAggregator))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the bus arbiter.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+import time
+import threading
+
+from janitoo_raspberry_i2c_bno055.arbiter import BusArbiter, get_arbiter
+from janitoo_raspberry_i2c_bno055.bench import SimI2CBus
+
+class TestBusArbiter(unittest.TestCase):
+    """Test the bus arbiter
+    """
+
+    def run_waiters(self, arbiter, clients):
+        """Hold the bus, queue the clients in order, then release it.
+        Return the names in the order the bus was granted
+        """
+        order = []
+        holder = arbiter.client('holder')
+        holder.i2c_acquire()
+        def access(client):
+            client.i2c_acquire()
+            order.append(client.name)
+            client.i2c_release()
+        threads = []
+        for client in clients:
+            thread = threading.Thread(target=access, args=(client,))
+            thread.start()
+            threads.append(thread)
+            #Let it queue
+            while len(arbiter._queue) < len(threads):
+                time.sleep(0.001)
+        holder.i2c_release()
+        for thread in threads:
+            thread.join(1)
+        return order
+
+    def test_001_priority(self):
+        arbiter = BusArbiter(SimI2CBus(1))
+        clients = [arbiter.client('low', priority=0), arbiter.client('high', priority=10),
+            arbiter.client('mid', priority=5)]
+        self.assertEqual(self.run_waiters(arbiter, clients), ['high', 'mid', 'low'])
+        self.assertEqual(arbiter._owner, None)
+        self.assertEqual(clients[0].waits.count, 1)
+
+    def test_002_deadline(self):
+        arbiter = BusArbiter(SimI2CBus(1))
+        clients = [arbiter.client('none'), arbiter.client('late', deadline=lambda: 20.0),
+            arbiter.client('early', deadline=lambda: 10.0)]
+        self.assertEqual(self.run_waiters(arbiter, clients), ['early', 'late', 'none'])
+
+    def test_003_budget(self):
+        arbiter = BusArbiter(SimI2CBus(1))
+        greedy = arbiter.client('greedy', priority=10, budget=0.01)
+        greedy.i2c_acquire()
+        time.sleep(0.02)
+        greedy.i2c_release()
+        self.assertTrue(greedy.over_budget(greedy._window))
+        other = arbiter.client('other', priority=0)
+        self.assertEqual(self.run_waiters(arbiter, [greedy, other]), ['other', 'greedy'])
+        self.assertEqual(greedy.deferred, 1)
+
+    def test_004_shared(self):
+        bus = SimI2CBus(7)
+        self.assertTrue(get_arbiter(bus) is get_arbiter(bus))
+        self.assertFalse(get_arbiter(bus) is get_arbiter(SimI2CBus(7)))
+        client = get_arbiter(bus).client('test')
+        self.assertEqual(client.get_busnum(), 7)
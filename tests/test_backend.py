@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the sensor backends.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from janitoo_raspberry_i2c_bno055.frame import BNO055_DATA_ADDR, BNO055_DATA_LEN, decode_frame
+from janitoo_raspberry_i2c_bno055.backend import SimBNO055, get_sensor_class, make_sensor
+from janitoo_raspberry_i2c_bno055.backend import read_trace, write_trace, synthetic_frame
+from janitoo_raspberry_i2c_bno055 import chip
+
+class FakeBus(object):
+    def i2c_acquire(self):
+        pass
+    def i2c_release(self):
+        pass
+
+class TestSimBNO055(unittest.TestCase):
+    """Test the simulated chip
+    """
+
+    def test_001_backends(self):
+        self.assertEqual(get_sensor_class('sim'), SimBNO055)
+        self.assertRaises(ValueError, get_sensor_class, 'bogus')
+
+    def test_002_begin(self):
+        sensor = make_sensor('sim', rst=17, address=0x29, latency=0)
+        self.assertTrue(chip.begin(sensor, FakeBus(), sleep=lambda delay: None))
+        self.assertTrue(chip.is_calibrated(sensor.get_calibration_status()))
+
+    def test_003_synthetic(self):
+        sensor = SimBNO055(latency=0)
+        frame = decode_frame(sensor._read_bytes(BNO055_DATA_ADDR, BNO055_DATA_LEN))
+        self.assertAlmostEqual(frame['gravity_z'], 9.81)
+        self.assertEqual(frame['temperature'], sensor.read_temp())
+        self.assertEqual(sensor.transactions, 2)
+
+    def test_004_calibration(self):
+        sensor = SimBNO055(latency=0)
+        sensor.set_calibration(list(range(22)))
+        self.assertEqual(sensor.get_calibration(), list(range(22)))
+        self.assertRaises(ValueError, sensor.set_calibration, [1, 2])
+
+    def test_005_interrupts(self):
+        sensor = SimBNO055(latency=0)
+        bus = FakeBus()
+        interrupts = chip.interrupt_registers(any_motion=0.1, no_motion=0.05)
+        self.assertTrue(chip.begin(sensor, bus, interrupts=interrupts, sleep=lambda delay: None))
+        #Written to page 1, the data registers are not touched
+        self.assertEqual(sensor.page1[chip.BNO055_INT_EN_ADDR], chip.INT_ACC_AM | chip.INT_ACC_NM)
+        self.assertEqual(sensor.regs[chip.BNO055_PAGE_ID_ADDR], 0)
+        self.assertFalse(sensor.interrupt(chip.INT_ACC_HIGH_G))
+        self.assertTrue(sensor.interrupt(chip.INT_ACC_AM))
+        self.assertEqual(chip.read_interrupts(sensor, bus), chip.INT_ACC_AM)
+        self.assertEqual(chip.read_interrupts(sensor, bus), 0)
+
+class TestTrace(unittest.TestCase):
+    """Test the replay of traces
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_001_write_read(self):
+        path = os.path.join(self.tmpdir, 'trace.txt')
+        frames = [synthetic_frame(i) for i in range(5)]
+        write_trace(path, frames)
+        self.assertEqual(read_trace(path), frames)
+
+    def test_002_replay(self):
+        frames = read_trace(os.path.join(os.path.dirname(__file__), 'data', 'bno055_trace.txt'))
+        sensor = SimBNO055(latency=0, trace=os.path.join(os.path.dirname(__file__), 'data', 'bno055_trace.txt'), rate=1e-6)
+        self.assertEqual(sensor._read_bytes(BNO055_DATA_ADDR, BNO055_DATA_LEN), frames[0])
+
+    def test_003_bad_trace(self):
+        path = os.path.join(self.tmpdir, 'trace.txt')
+        with open(path, 'w') as ftrace:
+            ftrace.write('0011\n')
+        self.assertRaises(ValueError, read_trace, path)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the benchmark.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import threading
+import time
+import unittest
+
+from janitoo_raspberry_i2c_bno055.bench import SimI2CBus, percentile
+
+class TestBench(unittest.TestCase):
+    """Test the benchmark helpers
+    """
+
+    def test_001_percentile(self):
+        values = list(range(101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), None)
+
+    def test_002_bus_wait(self):
+        bus = SimI2CBus()
+        bus.i2c_acquire()
+        thread = threading.Thread(target=lambda: (bus.i2c_acquire(), bus.i2c_release()))
+        thread.start()
+        time.sleep(0.05)
+        bus.i2c_release()
+        thread.join()
+        self.assertEqual(len(bus.waits), 2)
+        self.assertTrue(max(bus.waits) >= 0.04)
+        self.assertEqual(bus.get_busnum(), 1)
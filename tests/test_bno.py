@@ -39,6 +39,8 @@ from janitoo_nosetests.thread import JNTTThreadRun, JNTTThreadRunCommon
 from janitoo_nosetests.component import JNTTComponent, JNTTComponentCommon
 
 from janitoo.utils import json_dumps, json_loads
+
+from janitoo_raspberry_i2c_bno055.bench import measure_startup
 from janitoo.utils import HADD_SEP, HADD
 from janitoo.utils import TOPIC_HEARTBEAT
 from janitoo.utils import TOPIC_NODES, TOPIC_NODES_REPLY, TOPIC_NODES_REQUEST
@@ -50,6 +52,21 @@ class TestBNOComponent(JNTTComponent, JNTTComponentCommon):
     """
     component_name = "rpii2c.bno"
 
+#The modules which should only be imported when they are used
+DEFERRED_MODULES = ('Adafruit_BNO055', 'Adafruit_GPIO', 'RPi', 'numpy',
+    'janitoo_raspberry_i2c_bno055.spool', 'janitoo_raspberry_i2c_bno055.trigger',
+    'janitoo_raspberry_i2c_bno055.gpio', 'janitoo_raspberry_i2c_bno055.arbiter',
+    'janitoo_raspberry_i2c_bno055.power')
+
+class TestBNOStartup(unittest.TestCase):
+    """Test the startup of the component
+    """
+
+    def test_001_entry_point(self):
+        load_time, imported = measure_startup(DEFERRED_MODULES)
+        print("Entry point rpii2c.bno loaded in %.3f s" % load_time)
+        self.assertEqual(imported, [])
+
 class TestBNOThread(JNTTThreadRun, JNTTThreadRunCommon):
     """Test the datarrd thread
     """
@@ -61,6 +78,7 @@ class TestBNOThread(JNTTThreadRun, JNTTThreadRunCommon):
         self.wait_for_nodeman()
         time.sleep(5)
         self.assertValueOnBus('bno1','temperature')
+        self.assertValueOnBus('bno1','heading')
 
     def test_102_get_values(self):
         self.onlyRasperryTest()
@@ -70,3 +88,46 @@ class TestBNOThread(JNTTThreadRun, JNTTThreadRunCommon):
         print(data)
         self.assertNotEqual(data, None)
         self.assertNotInLogfile('^ERROR ')
+
+class TestBNOSimThread(JNTTThreadRun, JNTTThreadRunCommon):
+    """Test the thread with the simulated chip
+    """
+    thread_name = "rpii2c"
+    conf_file = "tests/data/janitoo_raspberry_i2c_bno_sim.conf"
+
+    def test_102_get_values(self):
+        self.wait_for_nodeman()
+        time.sleep(5)
+        data = self.thread.bus.nodeman.find_value('bno1','heading').data
+        self.assertNotEqual(data, None)
+        self.assertNotInLogfile('^ERROR ')
+
+    def test_103_reload_settings(self):
+        self.wait_for_nodeman()
+        time.sleep(5)
+        self.thread.bus.nodeman.find_value('bno1', 'window_size').data = 20
+        #The settings are checked every reload_interval (5) seconds
+        time.sleep(7)
+        self.assertInLogfile('Settings reloaded : start_windows')
+        self.assertNotInLogfile('^ERROR ')
+
+class TestBNOSimDeadbandThread(JNTTThreadRun, JNTTThreadRunCommon):
+    """Test the values published on change when polling (no sample_rate)
+    """
+    thread_name = "rpii2c"
+    conf_file = "tests/data/janitoo_raspberry_i2c_bno_sim_deadband.conf"
+
+    def test_102_get_values(self):
+        self.wait_for_nodeman()
+        time.sleep(5)
+        data = []
+        #Publishing a value on change reads the cache again : it must not block
+        reader = threading.Thread(target=lambda: data.append(
+            self.thread.bus.nodeman.find_value('bno1', 'temperature').data))
+        reader.daemon = True
+        reader.start()
+        reader.join(10)
+        self.assertFalse(reader.is_alive())
+        self.assertNotEqual(data[0], None)
+        self.assertNotEqual(self.thread.bus.nodeman.find_value('bno1', 'heading').data, None)
+        self.assertNotInLogfile('^ERROR ')
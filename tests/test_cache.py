@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the frame cache.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import time
+import threading
+import unittest
+
+from janitoo_raspberry_i2c_bno055.cache import FrameCache
+
+class TestFrameCache(unittest.TestCase):
+    """Test the frame cache
+    """
+
+    def setUp(self):
+        self.loads = 0
+
+    def loader(self):
+        self.loads += 1
+        return {'temperature':float(self.loads)}
+
+    def test_001_disabled(self):
+        cache = FrameCache(self.loader)
+        cache.get()
+        cache.get()
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 0)
+
+    def test_002_fresh(self):
+        cache = FrameCache(self.loader, max_age=10)
+        self.assertEqual(cache.get()['temperature'], 1.0)
+        self.assertEqual(cache.get()['temperature'], 1.0)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_003_expired(self):
+        cache = FrameCache(self.loader, max_age=0.01)
+        cache.get()
+        time.sleep(0.02)
+        self.assertEqual(cache.get()['temperature'], 2.0)
+        self.assertEqual(cache.misses, 2)
+
+    def test_004_error_not_cached(self):
+        cache = FrameCache(lambda: None, max_age=10)
+        self.assertEqual(cache.get(), None)
+        self.assertEqual(cache.get(), None)
+        self.assertEqual(cache.misses, 2)
+
+    def test_005_put_and_clear(self):
+        cache = FrameCache(self.loader, max_age=10)
+        cache.put({'temperature':42.0})
+        self.assertEqual(cache.get()['temperature'], 42.0)
+        cache.clear()
+        self.assertEqual(cache.get()['temperature'], 1.0)
+
+    def test_006_listener(self):
+        frames = []
+        def listener(frame):
+            #Like a value published on change : it reads the cache again
+            frames.append(cache.get())
+        cache = FrameCache(self.loader, listener=listener)
+        result = []
+        reader = threading.Thread(target=lambda: result.append(cache.get()))
+        reader.start()
+        reader.join(1)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(result[0]['temperature'], 1.0)
+        self.assertEqual(frames, result)
+        self.assertEqual(self.loads, 1)
+        #Outside of the listener, the disabled cache reads a new frame
+        self.assertEqual(cache.get()['temperature'], 2.0)
+
+    def test_007_load(self):
+        frames = []
+        cache = FrameCache(self.loader, max_age=10, listener=frames.append)
+        cache.get()
+        self.assertEqual(cache.load()['temperature'], 2.0)
+        self.assertEqual(cache.get()['temperature'], 2.0)
+        self.assertEqual([frame['temperature'] for frame in frames], [1.0, 2.0])
+
+    def test_008_held(self):
+        cache = FrameCache(self.loader, max_age=0.01)
+        cache.get()
+        cache.held = True
+        time.sleep(0.02)
+        self.assertEqual(cache.get()['temperature'], 1.0)
+        self.assertEqual(cache.load()['temperature'], 2.0)
+        self.assertEqual(cache.get()['temperature'], 2.0)
+        cache.held = False
+        time.sleep(0.02)
+        self.assertEqual(cache.get()['temperature'], 3.0)
+        cache.held = True
+        cache.clear()
+        self.assertFalse(cache.held)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the BNO055 chip management.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from janitoo_raspberry_i2c_bno055 import chip
+
+class FakeBus(object):
+    """A bus recording if the lock is held
+    """
+    def __init__(self):
+        self.locked = False
+    def i2c_acquire(self):
+        self.locked = True
+    def i2c_release(self):
+        self.locked = False
+
+class FakeSensor(object):
+    """A register map
+    """
+    _rst = None
+    def __init__(self, chip_id=chip.BNO055_ID):
+        self.regs = bytearray(0x80)
+        self.regs[chip.BNO055_CHIP_ID_ADDR] = chip_id
+    def _write_byte(self, address, value, ack=True):
+        self.regs[address] = value
+    def _write_bytes(self, address, data, ack=True):
+        self.regs[address:address + len(data)] = bytearray(data)
+    def _read_byte(self, address):
+        return self.regs[address]
+
+class TestBegin(unittest.TestCase):
+    """Test the initialization of the chip
+    """
+
+    def test_001_begin(self):
+        bus = FakeBus()
+        sensor = FakeSensor()
+        sleeps = []
+        def sleep(delay):
+            self.assertFalse(bus.locked)
+            sleeps.append(delay)
+        calibration = bytearray(range(chip.BNO055_CALIB_LEN))
+        self.assertTrue(chip.begin(sensor, bus, calibration=calibration, sleep=sleep))
+        self.assertTrue(chip.RESET_DELAY in sleeps)
+        self.assertEqual(sensor.regs[chip.BNO055_OPR_MODE_ADDR], chip.OPERATION_MODE_NDOF)
+        self.assertEqual(sensor.regs[chip.BNO055_CALIB_ADDR:chip.BNO055_CALIB_ADDR + chip.BNO055_CALIB_LEN], calibration)
+        self.assertFalse(bus.locked)
+
+    def test_002_bad_id(self):
+        bus = FakeBus()
+        self.assertFalse(chip.begin(FakeSensor(chip_id=0x55), bus, sleep=lambda delay: None))
+        self.assertFalse(bus.locked)
+
+    def test_003_interrupt_registers(self):
+        self.assertEqual(chip.interrupt_registers(), [])
+        registers = dict(chip.interrupt_registers(any_motion=0.1, no_motion=0.05, no_motion_delay=5, high_g=3.0))
+        self.assertEqual(registers[chip.BNO055_ACC_AM_THRES_ADDR], 13)
+        self.assertEqual(registers[chip.BNO055_ACC_NM_THRES_ADDR], 6)
+        self.assertEqual(registers[chip.BNO055_ACC_NM_SET_ADDR], 0x09)
+        self.assertEqual(registers[chip.BNO055_ACC_HG_THRES_ADDR], 192)
+        self.assertEqual(registers[chip.BNO055_INT_EN_ADDR], chip.INT_ACC_AM | chip.INT_ACC_NM | chip.INT_ACC_HIGH_G)
+        self.assertEqual(registers[chip.BNO055_INT_MSK_ADDR], registers[chip.BNO055_INT_EN_ADDR])
+        registers = dict(chip.interrupt_registers(high_g=100.0))
+        self.assertEqual(registers[chip.BNO055_ACC_HG_THRES_ADDR], 255)
+        self.assertEqual(registers[chip.BNO055_INT_EN_ADDR], chip.INT_ACC_HIGH_G)
+
+    def test_004_power_mode(self):
+        bus = FakeBus()
+        sensor = FakeSensor()
+        sleeps = []
+        def sleep(delay):
+            self.assertFalse(bus.locked)
+            sleeps.append(delay)
+        self.assertTrue(chip.begin(sensor, bus, mode=chip.OPERATION_MODES['imuplus'],
+            power_mode=chip.POWER_MODE_LOWPOWER, sleep=sleep))
+        self.assertEqual(sensor.regs[chip.BNO055_PWR_MODE_ADDR], chip.POWER_MODE_LOWPOWER)
+        self.assertEqual(sensor.regs[chip.BNO055_OPR_MODE_ADDR], 0x08)
+        sleeps[:] = []
+        chip.set_power_mode(sensor, bus, chip.POWER_MODES['normal'], sleep=sleep)
+        self.assertEqual(sensor.regs[chip.BNO055_PWR_MODE_ADDR], chip.POWER_MODE_NORMAL)
+        self.assertEqual(sensor.regs[chip.BNO055_OPR_MODE_ADDR], 0x08)
+        self.assertEqual(sleeps, [chip.MODE_DELAY, chip.MODE_DELAY])
+        self.assertFalse(bus.locked)
+
+    def test_005_idle_power_modes(self):
+        #Nothing would wake a suspended chip
+        self.assertFalse(chip.POWER_MODE_SUSPEND in chip.IDLE_POWER_MODES.values())
+        self.assertEqual(chip.IDLE_POWER_MODES['lowpower'], chip.POWER_MODE_LOWPOWER)
+
+    def test_006_operation_mode(self):
+        bus = FakeBus()
+        sensor = FakeSensor()
+        calibration = bytearray(range(chip.BNO055_CALIB_LEN))
+        self.assertTrue(chip.begin(sensor, bus, calibration=calibration, sleep=lambda delay: None))
+        sleeps = []
+        def sleep(delay):
+            self.assertFalse(bus.locked)
+            sleeps.append(delay)
+        chip.set_operation_mode(sensor, bus, chip.OPERATION_MODES['imuplus'], sleep=sleep)
+        self.assertEqual(sensor.regs[chip.BNO055_OPR_MODE_ADDR], 0x08)
+        self.assertEqual(sensor.regs[chip.BNO055_PWR_MODE_ADDR], chip.POWER_MODE_NORMAL)
+        self.assertEqual(sleeps, [chip.MODE_DELAY, chip.MODE_DELAY])
+        #Not reset : the calibration offsets are still there
+        self.assertEqual(sensor.regs[chip.BNO055_CALIB_ADDR:chip.BNO055_CALIB_ADDR + chip.BNO055_CALIB_LEN], calibration)
+        #Kept by the next power mode change
+        chip.set_power_mode(sensor, bus, chip.POWER_MODE_LOWPOWER, sleep=sleep)
+        self.assertEqual(sensor.regs[chip.BNO055_OPR_MODE_ADDR], 0x08)
+        self.assertEqual(sensor.regs[chip.BNO055_PWR_MODE_ADDR], chip.POWER_MODE_LOWPOWER)
+        self.assertFalse(bus.locked)
+
+class TestCalibration(unittest.TestCase):
+    """Test the calibration files
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_001_save_load(self):
+        path = os.path.join(self.tmpdir, 'bno1_bno055.cal')
+        self.assertEqual(chip.load_calibration(path), None)
+        self.assertEqual(chip.load_calibration(None), None)
+        chip.save_calibration(path, list(range(22)))
+        self.assertEqual(chip.load_calibration(path), bytearray(range(22)))
+
+    def test_002_bad_file(self):
+        path = os.path.join(self.tmpdir, 'bno1_bno055.cal')
+        with open(path, 'wb') as fcal:
+            fcal.write(b'abc')
+        self.assertEqual(chip.load_calibration(path), None)
+
+    def test_003_is_calibrated(self):
+        self.assertTrue(chip.is_calibrated((3, 3, 3, 3)))
+        self.assertFalse(chip.is_calibrated((3, 3, 2, 3)))
+        self.assertFalse(chip.is_calibrated(None))
+        #The unused sensors are not calibrated
+        self.assertFalse(chip.is_calibrated((3, 3, 3, 0)))
+        self.assertTrue(chip.is_calibrated((3, 3, 3, 0), chip.OPERATION_MODES['imuplus']))
+        self.assertTrue(chip.is_calibrated((0, 0, 3, 0), chip.OPERATION_MODES['acconly']))
+        self.assertFalse(chip.is_calibrated((0, 3, 2, 3), chip.OPERATION_MODES['amg']))
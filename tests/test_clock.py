@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the clocks of the frames.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import time
+import unittest
+
+from janitoo_raspberry_i2c_bno055.frame import monotonic
+from janitoo_raspberry_i2c_bno055.clock import WallClock, IntervalStats
+
+class TestWallClock(unittest.TestCase):
+    """Test the mapping to the wall clock
+    """
+
+    def test_001_wall(self):
+        clock = WallClock()
+        self.assertTrue(clock.uncertainty < 0.01)
+        self.assertTrue(abs(clock.wall(monotonic()) - time.time()) < 0.01)
+        self.assertEqual(clock.step, 0.0)
+
+    def test_002_sync(self):
+        clock = WallClock(interval=60)
+        self.assertFalse(clock.due())
+        #(synced + 60) - synced may round under 60
+        self.assertTrue(clock.due(clock.synced + 60.001))
+        clock.offset -= 1.0
+        self.assertAlmostEqual(clock.sync(), 1.0, places=2)
+        self.assertFalse(clock.due())
+        self.assertFalse(WallClock(interval=0).due(monotonic() + 3600))
+
+class TestIntervalStats(unittest.TestCase):
+    """Test the rate and jitter statistics
+    """
+
+    def test_001_rate(self):
+        stats = IntervalStats(window=1.0)
+        self.assertEqual(stats.rate, None)
+        for i in range(101):
+            #+/- 1 ms around a 10 ms period
+            stats.record(i * 0.01 + (0.001 if i % 2 else 0.0), period=0.01)
+        self.assertAlmostEqual(stats.rate, 100.0, places=6)
+        self.assertAlmostEqual(stats.jitter, 0.001, places=6)
+        self.assertAlmostEqual(stats.max_interval, 0.011, places=6)
+        self.assertEqual(stats.missed, 0)
+
+    def test_002_missed(self):
+        stats = IntervalStats(window=10.0)
+        for stamp in (0.0, 0.01, 0.02, 0.05, 0.06):
+            stats.record(stamp, period=0.01)
+        self.assertEqual(stats.missed, 2)
+        #A pause of the sampling is not counted
+        stats.restart()
+        stats.record(5.0, period=0.01)
+        stats.record(5.01, period=0.01)
+        self.assertEqual(stats.missed, 2)
+        self.assertTrue('missed:2' in stats.summary())
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the BNO055 devices.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+
+from janitoo_raspberry_i2c_bno055.device import BNODevice, parse_devices
+
+class TestDevices(unittest.TestCase):
+    """Test the devices helpers
+    """
+
+    def test_001_parse(self):
+        self.assertEqual(parse_devices(''), [])
+        self.assertEqual(parse_devices(None), [])
+        self.assertEqual(parse_devices('0x29, 41,'), [0x29, 41])
+        self.assertRaises(ValueError, parse_devices, '0x29,bogus')
+
+    def test_002_readable(self):
+        device = BNODevice(1, object(), 0x29, 1)
+        self.assertFalse(device.readable)
+        device.sensor = object()
+        self.assertTrue(device.readable)
+        device.recovery.failure(now=0.0)
+        device.recovery.failure(now=0.0)
+        device.recovery.failure(now=0.0)
+        self.assertFalse(device.readable)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the motion features.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+import math
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+from janitoo_raspberry_i2c_bno055.acquisition import FrameRing
+from janitoo_raspberry_i2c_bno055.features import FeatureExtractor, get_numpy, STANDARD_GRAVITY
+
+def still_frame(**channels):
+    frame = dict((name, 0.0) for name in CHANNEL_NAMES)
+    frame.update(accel_z=STANDARD_GRAVITY, gravity_z=STANDARD_GRAVITY)
+    frame.update(channels)
+    return frame
+
+@unittest.skipIf(get_numpy() is None, "numpy is not installed")
+class TestFeatures(unittest.TestCase):
+    """Test the motion features
+    """
+    rate = 100.0
+
+    def fill(self, ring, count, maker, start=0):
+        for i in range(start, start + count):
+            ring.push(maker(i / self.rate), stamp=i / self.rate)
+
+    def test_001_tilt(self):
+        ring = FrameRing(200)
+        features = FeatureExtractor(100)
+        angle = math.radians(30)
+        tilted = lambda t: still_frame(gravity_y=STANDARD_GRAVITY * math.sin(angle),
+            gravity_z=STANDARD_GRAVITY * math.cos(angle))
+        self.fill(ring, 99, tilted)
+        self.assertFalse(features.due(ring))
+        self.assertEqual(features.get('tilt'), None)
+        self.fill(ring, 1, tilted, start=99)
+        self.assertTrue(features.due(ring))
+        features.update(ring)
+        self.assertFalse(features.due(ring))
+        #The ring keeps the raw values of the chip : gravity is quantized to 0.01 m/s²
+        self.assertAlmostEqual(features.get('tilt'), 30.0, delta=0.1)
+        self.assertEqual(features.get('linear_max'), 0.0)
+        self.assertEqual(features.get('steps'), 0)
+        self.assertEqual(features.get('impacts'), 0)
+
+    def test_002_vibration(self):
+        ring = FrameRing(256)
+        features = FeatureExtractor(256, band_low=5.0, band_high=40.0)
+        self.fill(ring, 256, lambda t: still_frame(linear_x=2.0 * math.sin(2 * math.pi * 12.5 * t)))
+        features.update(ring)
+        self.assertAlmostEqual(features.get('vibration_freq'), 12.5, places=3)
+        self.assertAlmostEqual(features.get('vibration_energy'), 2.0, delta=0.1)
+        self.assertAlmostEqual(features.get('linear_max'), 2.0, places=3)
+
+    def test_003_steps_impacts(self):
+        ring = FrameRing(100)
+        features = FeatureExtractor(100, step_threshold=1.0, step_interval=0.3, impact_threshold=2.0)
+        def maker(t):
+            i = int(round(t * self.rate))
+            if i % 50 == 10:
+                #A step every 0.5s, with a second peak which is too close
+                return still_frame(linear_z=3.0)
+            if i % 50 == 15:
+                return still_frame(linear_z=2.0)
+            if i % 100 in (70, 71, 72):
+                return still_frame(accel_z=3 * STANDARD_GRAVITY)
+            return still_frame()
+        self.fill(ring, 100, maker)
+        features.update(ring)
+        self.assertEqual(features.get('steps'), 2)
+        self.assertEqual(features.get('impacts'), 1)
+        #The counts go on over the next windows
+        self.fill(ring, 100, maker, start=100)
+        features.update(ring)
+        self.assertEqual(features.get('steps'), 4)
+        self.assertEqual(features.get('impacts'), 2)
+
+    def test_004_take_over(self):
+        ring = FrameRing(100)
+        features = FeatureExtractor(100, step_threshold=1.0, step_interval=0.3)
+        maker = lambda t: still_frame(linear_z=3.0) if int(round(t * self.rate)) % 50 == 10 else still_frame()
+        self.fill(ring, 100, maker)
+        features.update(ring)
+        self.assertEqual(features.get('steps'), 2)
+        #A reload of the thresholds doesn't reset the counts
+        reloaded = FeatureExtractor(100, step_threshold=2.0, step_interval=0.3)
+        reloaded.take_over(features)
+        self.assertEqual(reloaded.get('steps'), 2)
+        self.assertFalse(reloaded.due(ring))
+        self.fill(ring, 100, maker, start=100)
+        reloaded.update(ring)
+        self.assertEqual(reloaded.get('steps'), 4)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the BNO055 data block.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+
+from janitoo_raspberry_i2c_bno055.frame import BNO055_DATA_LEN, FRAME_STRUCT, CHANNEL_NAMES, Frame, decode_frame
+
+class TestFrame(unittest.TestCase):
+    """Test the decoding of the data block
+    """
+
+    def test_001_struct_size(self):
+        self.assertEqual(FRAME_STRUCT.size, BNO055_DATA_LEN)
+        self.assertEqual(len(CHANNEL_NAMES), 23)
+
+    def test_002_decode(self):
+        raw = [0] * 23
+        raw[0] = 981
+        raw[6] = -32
+        raw[9] = 16 * 270
+        raw[12] = 1 << 14
+        raw[22] = -5
+        frame = decode_frame(bytearray(FRAME_STRUCT.pack(*raw)))
+        self.assertAlmostEqual(frame['accel_x'], 9.81)
+        self.assertAlmostEqual(frame['gyro_x'], -2.0)
+        self.assertAlmostEqual(frame['heading'], 270.0)
+        self.assertAlmostEqual(frame['quat_w'], 1.0)
+        self.assertEqual(frame['temperature'], -5.0)
+        self.assertEqual(sorted(frame.keys()), sorted(CHANNEL_NAMES))
+
+    def test_003_decode_list(self):
+        data = list(bytearray(BNO055_DATA_LEN))
+        frame = decode_frame(data)
+        self.assertEqual(frame['temperature'], 0.0)
+
+    def test_004_slots(self):
+        frame = decode_frame(bytearray(BNO055_DATA_LEN))
+        self.assertFalse(hasattr(frame, '__dict__'))
+        self.assertEqual(frame.raw.typecode, 'h')
+        self.assertEqual(len(frame), len(CHANNEL_NAMES))
+        self.assertTrue('gyro_z' in frame)
+        self.assertEqual(frame.get('foo', 1), 1)
+
+    def test_005_from_dict(self):
+        frame = Frame.from_dict({'accel_x':9.81, 'heading':270.0, 'quat_w':1.0})
+        self.assertEqual(frame.raw[0], 981)
+        self.assertAlmostEqual(frame['heading'], 270.0)
+        self.assertAlmostEqual(frame['quat_w'], 1.0)
+        self.assertEqual(frame['gyro_x'], 0.0)
+        self.assertEqual(frame, decode_frame(bytearray(FRAME_STRUCT.pack(*frame.raw))))
+        #Clipped to the int16 range
+        self.assertEqual(Frame.from_dict({'accel_x':1000.0}).raw[0], 32767)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the interrupt pin.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+import threading
+
+from janitoo_raspberry_i2c_bno055.gpio import FakeInterruptPin, AdafruitInterruptPin, make_interrupt_pin
+
+class FakeGPIO(object):
+    """Record the calls of Adafruit_GPIO
+    """
+    def __init__(self):
+        self.callbacks = {}
+    def setup(self, pin, mode, pull_up_down=None):
+        self.mode = mode
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=-1):
+        self.callbacks[pin] = callback
+    def remove_event_detect(self, pin):
+        del self.callbacks[pin]
+
+class TestInterruptPin(unittest.TestCase):
+    """Test the interrupt pins
+    """
+
+    def test_001_fake(self):
+        pin = make_interrupt_pin('fake', 4)
+        self.assertTrue(isinstance(pin, FakeInterruptPin))
+        self.assertFalse(pin.wait(0.01))
+        pin.trigger()
+        pin.trigger()
+        self.assertTrue(pin.wait(0.01))
+        self.assertFalse(pin.wait(0.01))
+        self.assertEqual(pin.edges, 2)
+        self.assertRaises(ValueError, make_interrupt_pin, 'bogus', 4)
+
+    def test_002_wake(self):
+        pin = FakeInterruptPin(4)
+        thread = threading.Thread(target=pin.wait)
+        thread.start()
+        pin.wake()
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(pin.edges, 0)
+
+    def test_003_adafruit(self):
+        try:
+            import Adafruit_GPIO
+        except ImportError:
+            raise unittest.SkipTest("Adafruit_GPIO is not installed")
+        gpio = FakeGPIO()
+        pin = AdafruitInterruptPin(17, gpio=gpio)
+        gpio.callbacks[17](17)
+        self.assertTrue(pin.wait(0.01))
+        pin.close()
+        self.assertEqual(gpio.callbacks, {})
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the activity policy.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+from janitoo_raspberry_i2c_bno055.features import STANDARD_GRAVITY
+from janitoo_raspberry_i2c_bno055.power import ActivityPolicy
+
+def make_frame(**channels):
+    frame = dict((name, 0.0) for name in CHANNEL_NAMES)
+    frame['accel_z'] = STANDARD_GRAVITY
+    frame.update(channels)
+    return frame
+
+class TestActivityPolicy(unittest.TestCase):
+    """Test the activity policy
+    """
+
+    def test_001_idle(self):
+        policy = ActivityPolicy(10.0, threshold=0.5)
+        still = make_frame(accel_x=0.1)
+        self.assertFalse(policy.update(still, 100.0))
+        self.assertFalse(policy.update(still, 109.0))
+        self.assertTrue(policy.update(still, 110.0))
+        self.assertTrue(policy.idle)
+        self.assertFalse(policy.update(still, 120.0))
+        self.assertTrue(policy.update(make_frame(accel_z=STANDARD_GRAVITY + 1), 121.0))
+        self.assertFalse(policy.idle)
+        self.assertFalse(policy.update(still, 130.0))
+        self.assertTrue(policy.update(still, 131.0))
+
+    def test_002_gyro(self):
+        policy = ActivityPolicy(1.0)
+        policy.update(make_frame(), 0.0)
+        self.assertTrue(policy.update(make_frame(), 1.0))
+        self.assertTrue(policy.update(make_frame(gyro_z=20.0), 2.0))
+
+    def test_003_interrupts(self):
+        policy = ActivityPolicy(60.0)
+        self.assertTrue(policy.sleep())
+        self.assertFalse(policy.sleep())
+        self.assertTrue(policy.active(10.0))
+        self.assertFalse(policy.active(11.0))
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the publishing policies.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import json
+import unittest
+
+from janitoo_raspberry_i2c_bno055.publish import Deadband, FrameBatcher, BrokerLink, decode_batch, encode_batch, BATCH_MAX_FRAMES
+
+class TestDeadband(unittest.TestCase):
+    """Test the deadband
+    """
+
+    def test_001_disabled(self):
+        self.assertFalse(Deadband().enabled)
+        self.assertFalse(Deadband(max_silence=10).enabled)
+
+    def test_002_absolute(self):
+        deadband = Deadband(absolute=0.5)
+        self.assertTrue(deadband.check(20.0, 0))
+        deadband.published(20.0, 0)
+        self.assertFalse(deadband.check(20.4, 1))
+        self.assertTrue(deadband.check(19.5, 1))
+        self.assertFalse(deadband.check(None, 1))
+
+    def test_003_relative(self):
+        deadband = Deadband(relative=0.1)
+        deadband.published(100.0, 0)
+        self.assertFalse(deadband.check(109.0, 1))
+        self.assertTrue(deadband.check(111.0, 1))
+        deadband.published(0.0, 0)
+        self.assertFalse(deadband.check(0.0, 1))
+        self.assertTrue(deadband.check(0.1, 1))
+
+    def test_004_max_silence(self):
+        deadband = Deadband(absolute=1.0, max_silence=60)
+        deadband.published(20.0, 0)
+        self.assertFalse(deadband.check(20.0, 59))
+        self.assertTrue(deadband.check(20.0, 60))
+        deadband.reset()
+        self.assertTrue(deadband.check(20.0, 61))
+
+class TestFrameBatcher(unittest.TestCase):
+    """Test the stream batches
+    """
+    channels = ('accel_x', 'gyro_z')
+
+    def frame(self, i):
+        return {'accel_x':float(i), 'gyro_z':-float(i), 'temperature':20.0}
+
+    def test_001_bad_config(self):
+        self.assertRaises(ValueError, FrameBatcher, self.channels, 10, fmt='xml')
+        self.assertRaises(ValueError, FrameBatcher, ('accel_x', 'bogus'), 10)
+
+    def test_002_binary(self):
+        batcher = FrameBatcher(self.channels, 3, max_latency=0)
+        self.assertEqual(batcher.add(1.0, self.frame(1)), None)
+        self.assertEqual(batcher.add(2.0, self.frame(2)), None)
+        payload = batcher.add(3.0, self.frame(3))
+        self.assertEqual(len(batcher), 0)
+        frames = decode_batch(payload, self.channels)
+        self.assertEqual([frame['accel_x'] for stamp, frame in frames], [1.0, 2.0, 3.0])
+        self.assertEqual(frames[2][1]['gyro_z'], -3.0)
+        self.assertAlmostEqual(frames[1][0] - frames[0][0], 1.0, places=3)
+
+    def test_003_json(self):
+        batcher = FrameBatcher(self.channels, 2, max_latency=0, fmt='json')
+        batcher.add(1.0, self.frame(1))
+        payload = json.loads(batcher.add(2.0, self.frame(2)))
+        self.assertEqual(payload['accel_x'], [1.0, 2.0])
+        self.assertEqual(len(payload['t']), 2)
+        self.assertEqual(batcher.flush(), None)
+
+    def test_004_max_latency(self):
+        batcher = FrameBatcher(self.channels, 100, max_latency=0.5)
+        self.assertEqual(batcher.add(1.0, self.frame(1)), None)
+        self.assertFalse(batcher.due(1.4))
+        self.assertNotEqual(batcher.add(1.5, self.frame(2)), None)
+
+    def test_005_encode_batch(self):
+        payload = encode_batch(self.channels, [10.0, 11.0], [[1.0, 2.0], [4.0, 5.0]])
+        decoded = decode_batch(payload, self.channels)
+        self.assertEqual([stamp for stamp, frame in decoded], [10.0, 11.0])
+        self.assertEqual(decoded[1][1][self.channels[1]], 5.0)
+        payload = json.loads(encode_batch(self.channels, [10.0], [[1.0, 2.0]], fmt='json'))
+        self.assertEqual(payload['t'], [10.0])
+        self.assertEqual(payload[self.channels[0]], [1.0])
+
+    def test_006_flush_due(self):
+        batcher = FrameBatcher(self.channels, 100, max_latency=0.5)
+        self.assertEqual(batcher.flush_due(10.0), None)
+        batcher.add(1.0, self.frame(1))
+        self.assertEqual(batcher.flush_due(1.2), None)
+        #No new frame : the timer flushes the batch
+        frames = decode_batch(batcher.flush_due(1.6), self.channels)
+        self.assertEqual([frame['accel_x'] for stamp, frame in frames], [1.0])
+        self.assertEqual(len(batcher), 0)
+
+    def test_007_max_size(self):
+        batcher = FrameBatcher(self.channels, 70000, max_latency=0)
+        self.assertEqual(batcher.size, BATCH_MAX_FRAMES)
+        payload = None
+        for i in range(BATCH_MAX_FRAMES):
+            payload = batcher.add(float(i), self.frame(i))
+        self.assertEqual(len(decode_batch(payload, self.channels)), BATCH_MAX_FRAMES)
+
+class FakePaho(object):
+    """A paho client
+    """
+
+    def __init__(self):
+        self.on_disconnect = None
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+class FakeMQTTClient(object):
+    """The Janitoo MQTTClient wrapping the paho client
+    """
+
+    def __init__(self):
+        self._mqttc = FakePaho()
+
+class TestBrokerLink(unittest.TestCase):
+    """Test the following of the connection to the broker
+    """
+
+    def test_001_return_codes(self):
+        link = BrokerLink()
+        link.attach(object())
+        self.assertTrue(link.is_connected())
+        #MQTT_ERR_NO_CONN
+        link.published(4)
+        self.assertFalse(link.is_connected())
+        #Unknown result
+        link.published(None)
+        self.assertFalse(link.is_connected())
+        link.published(0)
+        self.assertTrue(link.is_connected())
+        link.failed()
+        self.assertFalse(link.is_connected())
+
+    def test_002_is_connected(self):
+        mqttc = FakeMQTTClient()
+        paho = mqttc._mqttc
+        links = [BrokerLink(), BrokerLink()]
+        for link in links:
+            link.attach(mqttc)
+        paho.connected = False
+        self.assertEqual([link.is_connected() for link in links], [False, False])
+        links[0].detach()
+        paho.connected = True
+        self.assertTrue(links[1].is_connected())
+        #The callbacks of the shared client are left alone
+        self.assertTrue(paho.on_disconnect is None)
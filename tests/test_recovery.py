@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the error recovery.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+import logging
+
+from janitoo_raspberry_i2c_bno055.recovery import Recovery, ThrottledLog, STATE_OK, STATE_FAILING, STATE_DOWN
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+class TestRecovery(unittest.TestCase):
+    """Test the recovery state machine
+    """
+
+    def test_001_threshold(self):
+        rec = Recovery(threshold=3)
+        self.assertFalse(rec.failure(now=10.0))
+        self.assertEqual(rec.state, STATE_FAILING)
+        self.assertFalse(rec.failure(now=10.0))
+        self.assertTrue(rec.failure(now=10.0))
+        self.assertTrue(rec.down)
+        self.assertEqual(rec.state, STATE_DOWN)
+        self.assertFalse(rec.failure(now=10.0))
+        self.assertFalse(rec.due(now=10.5))
+        self.assertTrue(rec.due(now=11.0))
+        rec.success()
+        self.assertEqual(rec.state, STATE_OK)
+        self.assertFalse(rec.due(now=100.0))
+
+    def test_002_backoff(self):
+        rec = Recovery(threshold=1, backoff_max=5.0)
+        rec.failure(now=0.0)
+        delays = []
+        now = 0.0
+        for i in range(5):
+            delays.append(rec.next_attempt - now)
+            now = rec.next_attempt
+            rec.init_failure(now=now)
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0])
+
+    def test_003_initialized_keeps_backoff(self):
+        rec = Recovery(threshold=1)
+        rec.init_failure(now=0.0)
+        rec.init_failure(now=1.0)
+        rec.initialized()
+        self.assertEqual(rec.state, STATE_OK)
+        rec.failure(now=10.0)
+        self.assertEqual(rec.next_attempt, 14.0)
+        rec.success()
+        rec.failure(now=20.0)
+        self.assertEqual(rec.next_attempt, 21.0)
+
+class TestThrottledLog(unittest.TestCase):
+    """Test the throttled log
+    """
+
+    def test_001_throttle(self):
+        log = logging.getLogger('test_recovery_throttle')
+        log.propagate = False
+        handler = ListHandler()
+        log.addHandler(handler)
+        throttled = ThrottledLog(log, interval=3600)
+        for i in range(5):
+            try:
+                raise IOError('bus')
+            except IOError:
+                throttled.exception(1, 'read of %s', 'dev1')
+        try:
+            raise IOError('bus')
+        except IOError:
+            throttled.exception(2, 'read of %s', 'dev2')
+        self.assertEqual(len(handler.records), 2)
+        throttled.interval = 0
+        try:
+            raise IOError('bus')
+        except IOError:
+            throttled.exception(1, 'read of %s', 'dev1')
+        self.assertEqual(len(handler.records), 3)
+        self.assertTrue('4 similar errors suppressed' in handler.records[-1].getMessage())
+        self.assertTrue(handler.records[-1].exc_info is not None)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the frame spool.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from janitoo_raspberry_i2c_bno055.spool import Spool, SEGMENT_HEADER
+
+CHANNELS = ('accel_x', 'gyro_z')
+
+def make_frame(i):
+    return {'accel_x': float(i), 'gyro_z': -float(i), 'heading': 0.0}
+
+class TestSpool(unittest.TestCase):
+    """Test the spool
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmpdir, 'spool')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def fill(self, spool, start, count):
+        for i in range(start, start + count):
+            spool.append(1000.0 + i, make_frame(i))
+
+    def test_001_append_read(self):
+        spool = Spool(self.directory, CHANNELS, segment_records=10)
+        self.assertEqual(spool.read(0, 10), ([], []))
+        self.fill(spool, 0, 25)
+        self.assertEqual(len(spool), 25)
+        self.assertEqual(spool.segments, [0, 1, 2])
+        self.assertEqual(os.path.getsize(spool.path(0)), SEGMENT_HEADER.size + spool.record.size * 10)
+        stamps, rows = spool.read(1003.0, 5)
+        self.assertEqual(stamps, [1004.0, 1005.0, 1006.0, 1007.0, 1008.0])
+        self.assertEqual(rows[0], (4.0, -4.0))
+        stamps, rows = spool.read(1008.0, 100)
+        self.assertEqual(stamps[0], 1009.0)
+        self.assertEqual(stamps[-1], 1024.0)
+        self.assertEqual(spool.read(1024.0, 100), ([], []))
+        spool.close()
+
+    def test_002_size_cap(self):
+        spool = Spool(self.directory, CHANNELS, segment_records=10, max_bytes=1)
+        self.fill(spool, 0, 35)
+        self.assertEqual(spool.segments, [3])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['00000003.spool'])
+        spool.close()
+        spool = Spool(self.directory, CHANNELS, segment_records=10, max_bytes=3 * spool.segment_size)
+        self.fill(spool, 35, 30)
+        self.assertEqual(spool.segments, [4, 5, 6])
+        self.assertEqual(spool.read(0, 1)[0], [1040.0])
+        spool.close()
+
+    def test_003_reopen(self):
+        spool = Spool(self.directory, CHANNELS, segment_records=10)
+        self.fill(spool, 0, 13)
+        spool.close()
+        spool = Spool(self.directory, CHANNELS, segment_records=10)
+        self.assertEqual(len(spool), 13)
+        self.fill(spool, 13, 2)
+        self.assertEqual(spool.read(1011.0, 100)[0], [1012.0, 1013.0, 1014.0])
+        spool.close()
+        #Incompatible segments are dropped
+        spool = Spool(self.directory, ('accel_x',), segment_records=10)
+        self.assertEqual(len(spool), 0)
+        self.assertEqual(spool.segments, [0])
+        spool.close()
+
+    def test_004_bad_channels(self):
+        self.assertRaises(ValueError, Spool, self.directory, ['bogus'])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the I2C instrumentation.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+
+from janitoo_raspberry_i2c_bno055.stats import Histogram, I2CStats, READS, BYTES, ERRORS
+
+class TestHistogram(unittest.TestCase):
+    """Test the histogram
+    """
+
+    def test_001_empty(self):
+        histogram = Histogram()
+        self.assertEqual(histogram.mean(), None)
+        self.assertEqual(histogram.percentile(99), None)
+
+    def test_002_percentile(self):
+        histogram = Histogram()
+        for i in range(99):
+            histogram.record(0.0001)
+        histogram.record(0.5)
+        self.assertAlmostEqual(histogram.mean(), (99 * 0.0001 + 0.5) / 100)
+        #100 µs is in the bucket [64, 128[
+        self.assertEqual(histogram.percentile(50), 0.000128)
+        self.assertEqual(histogram.percentile(99), 0.000128)
+        self.assertEqual(histogram.percentile(100), 0.5)
+        self.assertEqual(histogram.max, 0.5)
+
+    def test_003_overflow_bucket(self):
+        histogram = Histogram()
+        histogram.record(3600.0)
+        self.assertEqual(histogram.percentile(99), 3600.0)
+        histogram.reset()
+        self.assertEqual(histogram.count, 0)
+
+class TestI2CStats(unittest.TestCase):
+    """Test the counters
+    """
+
+    def test_001_transfer(self):
+        stats = I2CStats()
+        stats.wait(0.001)
+        stats.transfer(0.002, 45)
+        stats.transfer(0.002, 45)
+        stats.incr(ERRORS)
+        self.assertEqual(stats.get(READS), 2)
+        self.assertEqual(stats.get(BYTES), 90)
+        self.assertEqual(stats.get(ERRORS), 1)
+        self.assertEqual(stats.lock_wait.count, 1)
+        self.assertTrue('reads:2 errors:1' in stats.summary())
+        stats.reset()
+        self.assertEqual(stats.get(READS), 0)
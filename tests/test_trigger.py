@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""Unittests for the event triggers.
+"""
+__license__ = """
+    This file is part of Janitoo.
+
+    Janitoo is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Janitoo is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Janitoo. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+__author__ = 'Sébastien GALLET aka bibi21000'
+__email__ = 'bibi21000@gmail.com'
+__copyright__ = "Copyright © 2013-2014-2015-2016 Sébastien GALLET aka bibi21000"
+
+import warnings
+warnings.filterwarnings("ignore")
+
+import unittest
+import json
+
+from janitoo_raspberry_i2c_bno055.frame import CHANNEL_NAMES
+from janitoo_raspberry_i2c_bno055.acquisition import FrameRing
+from janitoo_raspberry_i2c_bno055.features import STANDARD_GRAVITY
+from janitoo_raspberry_i2c_bno055.trigger import TriggerRule, TriggerEngine, parse_rules
+
+def make_frame(**channels):
+    frame = dict((name, 0.0) for name in CHANNEL_NAMES)
+    frame.update(channels)
+    return frame
+
+class TestTriggerRule(unittest.TestCase):
+    """Test the trigger rules
+    """
+
+    def test_001_parse(self):
+        rule = TriggerRule(' accel_magnitude > 2g ')
+        self.assertEqual(rule.channel, 'accel_magnitude')
+        self.assertEqual(rule.op, '>')
+        self.assertAlmostEqual(rule.threshold, 2 * STANDARD_GRAVITY)
+        self.assertEqual(rule.name, 'accel_magnitude > 2g')
+        self.assertEqual(len(parse_rules('gyro_magnitude>250, temperature^2,')), 2)
+        self.assertEqual(parse_rules(''), [])
+        self.assertRaises(ValueError, TriggerRule, 'bogus>1')
+        self.assertRaises(ValueError, TriggerRule, 'heading=1')
+
+    def test_002_edge(self):
+        rule = TriggerRule('heading>10')
+        self.assertEqual(rule.check(make_frame(heading=5)), None)
+        self.assertEqual(rule.check(make_frame(heading=12)), 12)
+        self.assertEqual(rule.check(make_frame(heading=15)), None)
+        self.assertEqual(rule.check(make_frame(heading=5)), None)
+        self.assertEqual(rule.check(make_frame(heading=11)), 11)
+
+    def test_003_step(self):
+        rule = TriggerRule('temperature^2')
+        self.assertEqual(rule.check(make_frame(temperature=25)), None)
+        self.assertEqual(rule.check(make_frame(temperature=26)), None)
+        self.assertEqual(rule.check(make_frame(temperature=28)), 28)
+        self.assertEqual(rule.check(make_frame(temperature=28)), None)
+
+class TestTriggerEngine(unittest.TestCase):
+    """Test the capture of the events
+    """
+
+    def run_frames(self, engine, ring, values, start=0):
+        payloads = []
+        for i, value in enumerate(values):
+            stamp = (start + i) * 0.01
+            frame = make_frame(accel_x=value)
+            ring.push(frame, stamp)
+            payload = engine.process(stamp, frame, ring)
+            if payload is not None:
+                payloads.append(payload)
+        return payloads
+
+    def test_001_capture(self):
+        ring = FrameRing(100)
+        engine = TriggerEngine(parse_rules('accel_magnitude>1g'), ['accel_x'], pre=3, post=2, holdoff=0.0, device=1)
+        values = [0.0] * 10 + [20.0] + [0.0] * 5
+        payloads = self.run_frames(engine, ring, values)
+        self.assertEqual(len(payloads), 1)
+        event = json.loads(payloads[0])
+        self.assertEqual(event['rule'], 'accel_magnitude>1g')
+        self.assertEqual(event['device'], 1)
+        self.assertEqual(event['value'], 20.0)
+        self.assertEqual(event['accel_x'], [0.0, 0.0, 0.0, 20.0, 0.0, 0.0])
+        self.assertEqual(len(event['t']), 6)
+        self.assertAlmostEqual(event['t'][3], event['stamp'])
+        self.assertEqual(engine.fired, 1)
+
+    def test_002_holdoff(self):
+        ring = FrameRing(100)
+        engine = TriggerEngine(parse_rules('accel_x>1'), ['accel_x'], pre=1, post=1, holdoff=0.1)
+        #The second trigger is during the holdoff of the first event
+        values = [0.0, 2.0, 0.0, 0.0, 2.0, 0.0, 0.0] + [0.0] * 10 + [2.0, 0.0]
+        payloads = self.run_frames(engine, ring, values)
+        self.assertEqual(len(payloads), 2)
+        self.assertEqual(engine.fired, 2)
+        self.assertEqual(engine.missed, 1)
+
+    def test_003_bad_channels(self):
+        self.assertRaises(ValueError, TriggerEngine, [], ['bogus'])
+
+    def test_004_take_over(self):
+        ring = FrameRing(100)
+        engine = TriggerEngine(parse_rules('accel_x>1'), ['accel_x'], pre=1, post=1, holdoff=0.1)
+        self.run_frames(engine, ring, [0.0, 2.0, 0.0, 0.0])
+        self.assertEqual(engine.fired, 1)
+        #A reload of the rules doesn't reset the counts nor the holdoff
+        reloaded = TriggerEngine(parse_rules('accel_x>1.5'), ['accel_x'], pre=1, post=1, holdoff=0.1)
+        reloaded.take_over(engine)
+        self.run_frames(reloaded, ring, [2.0, 0.0] + [0.0] * 10 + [2.0, 0.0], start=4)
+        self.assertEqual(reloaded.fired, 2)
+        self.assertEqual(reloaded.missed, 1)